@@ -4,13 +4,20 @@ Utility Package
 A comprehensive tool for managing AWS profiles, credentials, environments, S3, SFTP, and MongoDB operations.
 """
 
-from aws_profile_manager.core.manager import AWSProfileManager
-from aws_profile_manager.core.config import ConfigManager
-from aws_profile_manager.aws.credentials import AWSCredentialsManager
-from aws_profile_manager.aws.environments import EnvironmentManager
-from aws_profile_manager.roles.assume_role import AWSRoleManager
-from aws_profile_manager.s3.manager import S3Manager
-from aws_profile_manager.utils.logging import setup_logging, get_logger
+import importlib
+
+# Exported names are imported on first access, so loading a submodule (e.g. the CLI)
+# doesn't pull in boto3 and paramiko through the managers
+_LAZY_EXPORTS = {
+    'AWSProfileManager': 'aws_profile_manager.core.manager',
+    'ConfigManager': 'aws_profile_manager.core.config',
+    'AWSCredentialsManager': 'aws_profile_manager.aws.credentials',
+    'EnvironmentManager': 'aws_profile_manager.aws.environments',
+    'AWSRoleManager': 'aws_profile_manager.roles.assume_role',
+    'S3Manager': 'aws_profile_manager.s3.manager',
+    'setup_logging': 'aws_profile_manager.utils.logging',
+    'get_logger': 'aws_profile_manager.utils.logging',
+}
 
 __version__ = "1.0.0"
 __author__ = "Utility Team"
@@ -26,3 +33,13 @@ __all__ = [
     'setup_logging',
     'get_logger'
 ]
+
+
+def __getattr__(name):
+    """Import an exported name the first time it is used"""
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
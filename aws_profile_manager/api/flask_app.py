@@ -1,575 +1,920 @@
-from flask import Flask, render_template, request, jsonify, flash, session
+from flask import Flask, Response, abort, render_template, request, jsonify, flash, session, g, has_request_context, redirect, send_file, current_app
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import HTTPException
 try:
     from bson import ObjectId
 except ImportError:
     ObjectId = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    from waitress import serve
+except ImportError:
+    serve = None
 from aws_profile_manager.core.manager import AWSProfileManager
-from aws_profile_manager.utils.logging import setup_logging
 from aws_profile_manager.api.session_manager import SessionManager
+from aws_profile_manager.aws.credentials import AWS_CONFIG_PATH, get_session_credentials
 from aws_profile_manager.mongo.manager import MongoManager
+from aws_profile_manager.utils.files import atomic_write
 import logging
 import os
 import configparser
+import json
+import re
+import secrets
+import subprocess
+import functools
+import io
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
 
-# Setup logging
-setup_logging()
 logger = logging.getLogger(__name__)
 
 # Project root for finding scripts/configs
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 
-# Initialize AWS Profile Manager
-aws_manager = AWSProfileManager()
+# Page templates compiled once when the app is created
+PAGE_TEMPLATES = (
+    'index.html', 'profiles.html', 'environments.html', 'credentials.html',
+    's3.html', 'efs.html', 'mongo.html', 'assume_role.html',
+)
+
+# GET endpoints answered with a weak ETag so unchanged responses become 304s
+ETAG_ENDPOINTS = frozenset({
+    'index', 'profiles', 'environments', 'credentials', 'api_status', 'api_bootstrap',
+    'api_list_custom_buckets', 'api_get_predefined_buckets', 'api_list_available_profiles',
+})
+
+
+def _ok(message):
+    """Response body for a successful API call"""
+    return {'success': True, 'message': message}
+
+
+def _error(message):
+    """Response body for a failed API call"""
+    return {'success': False, 'message': message}
+
+
+# Lifetime of the presigned URL download_s3_object redirects to when there's no local_path
+PRESIGNED_DOWNLOAD_EXPIRATION = 300
+
+# Largest JSON body the API accepts; file uploads are multipart and not limited by this
+MAX_JSON_BODY = 64 * 1024
+
+# S3 returns at most this many keys per ListObjectsV2 call; larger max_keys are clamped to it
+MAX_LIST_KEYS = 1000
+
+
+def _json(*required):
+    """Get the request's JSON body and the required keys that are missing or empty"""
+    if request.content_length is not None and request.content_length > MAX_JSON_BODY:
+        abort(413)
+    data = request.get_json(silent=True)
+    # Anything but a JSON object is treated like an empty body
+    if not isinstance(data, dict):
+        data = {}
+    missing = [key for key in required if not data.get(key)]
+    return data, missing
+
+
+# Error bodies shared by several views, built once
+_SAVE_FAILED = _error('Failed to save configuration')
+_NEED_BUCKET_NAME = _error('Bucket name is required')
+_NEED_BUCKET_AND_KEY = _error('Bucket name and object key are required')
+_NEED_REMOTE_PATH = _error('Remote path is required')
+_NEED_PROFILE_NAME = _error('Profile name is required')
+_ENV_NOT_FOUND = _error('Environment not found')
+
+
+# Script written by /api/assume_role_script; filled in with str.format
+_ASSUME_ROLE_SCRIPT = """#!/bin/bash
+# Auto-generated AWS Assume Role Script
+# Current Role: {config_name}
+# Description: {description}
+# Generated: {generated}
+
+# Clear previously assumed role credentials
+unset AWS_ACCESS_KEY_ID
+unset AWS_SECRET_ACCESS_KEY
+unset AWS_SESSION_TOKEN
+
+echo "🔄 Clearing previous AWS credentials..."
+echo "🔐 Assuming role: {config_name}..."
+
+response=$(aws sts assume-role \\
+  --role-arn {role_arn} \\
+  --role-session-name {session_name}{external_id_arg} 2>&1)
+
+# Check if assume-role was successful
+if [ $? -ne 0 ]; then
+  echo "❌ Failed to assume role"
+  echo "$response"
+  return 1
+fi
+
+# Parse and export credentials using jq
+export AWS_ACCESS_KEY_ID=$(echo "$response" | jq -r '.Credentials.AccessKeyId')
+export AWS_SECRET_ACCESS_KEY=$(echo "$response" | jq -r '.Credentials.SecretAccessKey')
+export AWS_SESSION_TOKEN=$(echo "$response" | jq -r '.Credentials.SessionToken')
+
+echo "✅ Successfully assumed role: {config_name}"
+echo "📌 You can now use: aws s3 ls"
+echo "⏰ Credentials will expire in 1 hour"
+"""
+_SCRIPT_GENERATED = Path(__file__).stat().st_mtime
+
+
+def _get_manager() -> AWSProfileManager:
+    """Get the AWS Profile Manager owned by the current app"""
+    return current_app.extensions['aws_manager']
+
+
+# Credentials page context shown when the real status cannot be loaded
+_EMPTY_CREDENTIALS_STATUS = {
+    'base_file_exists': False,
+    'default_profile_valid': False,
+    'infrrd_master_valid': False,
+    'in_sync': False,
+    'base_access_key': 'N/A',
+    'default_access_key': 'N/A',
+    'infrrd_access_key': 'N/A'
+}
+
+
+def _safe(template, **fallback):
+    """Render template with the fallback context if the page view raises"""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            try:
+                return f(*args, **kwargs)
+            except Exception as e:
+                logger.error('Error in %s: %s', f.__name__, e)
+                return render_template(template, **fallback)
+        return wrapper
+    return decorator
+
+
+# Profile sections api_clean_config leaves in ~/.aws/config
+KEEP_PROFILE_SECTIONS = frozenset({'profile default'})
+
+
+# One reusable ConfigParser per thread for code paths that need a full parse
+_parser_tls = threading.local()
+
+
+def _get_config_parser():
+    """Get this thread's ConfigParser, emptied and ready for a fresh read"""
+    config_parser = getattr(_parser_tls, 'parser', None)
+    if config_parser is None:
+        config_parser = _parser_tls.parser = configparser.ConfigParser()
+    else:
+        for section in config_parser.sections():
+            config_parser.remove_section(section)
+        config_parser.defaults().clear()
+    return config_parser
+
+
+# Short-lived cache for status reads that parse the credential files on every
+# call; set AWS_PROFILE_MANAGER_STATUS_TTL=0 to always read fresh status
+STATUS_CACHE_TTL = float(os.environ.get('AWS_PROFILE_MANAGER_STATUS_TTL', '2'))
+_STATUS_CACHE = {}
+_STATUS_CACHE_LOCK = threading.Lock()
+
+
+def _get_cached_status(key, loader):
+    """Get a status snapshot, reusing it for up to STATUS_CACHE_TTL seconds"""
+    # Within a request the snapshot is always reused, even with the TTL disabled
+    if has_request_context():
+        snapshots = g.setdefault('status_snapshots', {})
+        if key not in snapshots:
+            snapshots[key] = _load_status(key, loader)
+        return snapshots[key]
+    return _load_status(key, loader)
+
+
+def _load_status(key, loader):
+    """Get a status snapshot from the TTL cache, loading it when stale"""
+    if STATUS_CACHE_TTL <= 0:
+        return loader()
+
+    now = time.monotonic()
+    with _STATUS_CACHE_LOCK:
+        entry = _STATUS_CACHE.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+    value = loader()
+    with _STATUS_CACHE_LOCK:
+        _STATUS_CACHE[key] = (now + STATUS_CACHE_TTL, value)
+    return value
+
+
+def _invalidate_status_cache():
+    """Drop cached status snapshots after a mutation"""
+    with _STATUS_CACHE_LOCK:
+        _STATUS_CACHE.clear()
+    if has_request_context():
+        g.pop('status_snapshots', None)
+
+
+# get_credentials_status() parses the credential files; a watcher thread recomputes
+# it whenever one of them changes so requests only have to stat the files
+CREDENTIALS_WATCH_INTERVAL = 2
+
+
+def _credentials_files_key(manager):
+    """Identify the current state of the files the credentials status is built from"""
+    base_path = manager.config_manager.get_base_credentials_path()
+    paths = [manager.credentials_manager.credentials_path, manager.credentials_manager.config_path]
+    if base_path:
+        paths.append(Path(base_path).expanduser())
+    key = [base_path]
+    for path in paths:
+        try:
+            st = path.stat()
+            key.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            key.append(None)
+    return tuple(key)
+
+
+def _refresh_credentials_status(manager, cache):
+    """Get the credentials status, recomputing it only if its files changed"""
+    files_key = _credentials_files_key(manager)
+    entry = cache.get('entry')
+    if entry is None or entry[0] != files_key:
+        entry = (files_key, manager.get_credentials_status())
+        cache['entry'] = entry
+    return entry[1]
+
+
+def _watch_credentials_status(manager, cache, stop):
+    """Keep one app's cached credentials status current until stop is set"""
+    while not stop.is_set():
+        try:
+            _refresh_credentials_status(manager, cache)
+        except Exception as e:
+            logger.error("Failed to refresh credentials status: %s", e)
+        stop.wait(CREDENTIALS_WATCH_INTERVAL)
+
+
+def _start_credentials_watcher(app):
+    """Start the app's credentials status watcher thread, stopped by stop_credentials_watcher"""
+    stop = threading.Event()
+    thread = threading.Thread(target=_watch_credentials_status,
+                              args=(app.extensions['aws_manager'], app.extensions['credentials_status'], stop),
+                              name='credentials-status-watcher', daemon=True)
+    app.extensions['credentials_watcher'] = (thread, stop)
+    # The thread doesn't reference the app, so it also stops once the app is garbage collected
+    weakref.finalize(app, stop.set)
+    thread.start()
+
+
+def stop_credentials_watcher(app, timeout=None):
+    """Stop the app's credentials status watcher thread, if it has one running"""
+    watcher = app.extensions.pop('credentials_watcher', None)
+    if watcher is not None:
+        thread, stop = watcher
+        stop.set()
+        thread.join(timeout)
+
+
+def _get_credentials_status():
+    """Get the current app's credentials status"""
+    return _refresh_credentials_status(_get_manager(), current_app.extensions['credentials_status'])
+
+
+# Slow operations run here so request threads aren't held; finished jobs are
+# kept for JOB_RETENTION_SECONDS so the UI can poll for the outcome
+JOB_RETENTION_SECONDS = 300
+# A job's event stream sends a keep-alive at this interval and gives up (the
+# client falls back to polling) after JOB_STREAM_TIMEOUT seconds
+JOB_STREAM_HEARTBEAT = 15
+JOB_STREAM_TIMEOUT = 120
+_JOB_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='aws-profile-job')
+_JOBS = {}
+_JOBS_LOCK = threading.Lock()
+
+
+def _submit_job(fn, success_message, failure_message):
+    """Run fn in the background and return a job id to poll"""
+    def run():
+        try:
+            result = fn()
+            return {'success': bool(result), 'message': success_message if result else failure_message}
+        except Exception as e:
+            logger.error("Background job failed: %s", e)
+            return {'success': False, 'message': str(e)}
+        finally:
+            _invalidate_status_cache()
+
+    now = time.monotonic()
+    job_id = uuid.uuid4().hex
+    with _JOBS_LOCK:
+        # Evict jobs that finished long enough ago
+        for old_id, (future, submitted) in list(_JOBS.items()):
+            if future.done() and now - submitted > JOB_RETENTION_SECONDS:
+                del _JOBS[old_id]
+        _JOBS[job_id] = (_JOB_EXECUTOR.submit(run), now)
+    return job_id
+
+
+def _get_job(job_id):
+    """Get the future for a background job, or None if unknown"""
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+    return job[0] if job else None
+
+
+def _mutate_config(section, key, value):
+    """Set (or remove, when value is None) one entry of a dict section in config.json and save"""
+    config_manager = _get_manager().config_manager
+    entries = config_manager.config[section]
+    if value is None:
+        entries.pop(key, None)
+    else:
+        entries[key] = value
+    # Written before answering, so a failed save isn't reported as a success
+    return config_manager.save_config()
+
+
+# Fields stored for an assume role configuration, in config.json order
+ASSUME_ROLE_CONFIG_KEYS = ('role_arn', 'session_name', 'external_id', 'duration', 'description')
+
+
+def _put_assume_role_config(update):
+    """Add, or with update=True replace, the assume role configuration in the request body"""
+    data, missing = _json('config_name', 'description', 'role_arn', 'session_name')
+    if missing:
+        return _error('Configuration name, description, role ARN, and session name are required')
+
+    config_name = data['config_name']
+    if update and config_name not in _get_manager().config_manager.get_assume_role_configs():
+        return _error(f'Configuration {config_name} not found')
+
+    # Optional fields the client left empty aren't stored
+    entry = {key: data[key] for key in ASSUME_ROLE_CONFIG_KEYS if data.get(key) is not None}
+    duration = entry.setdefault('duration', 3600)
+    if isinstance(duration, bool) or not isinstance(duration, int):
+        return _error('Duration must be a whole number of seconds')
+    if not _mutate_config('assume_role_configs', config_name, entry):
+        return _SAVE_FAILED
+    return _ok(f"Role configuration {config_name} {'updated' if update else 'added'} successfully")
+
+
+def _change_bucket_list(section, add, done_message, failed_message):
+    """Add or remove the request's bucket_name in a bucket list section of config.json"""
+    data, missing = _json('bucket_name')
+    if missing:
+        return _NEED_BUCKET_NAME
+
+    bucket_name = data['bucket_name']
+    config_manager = _get_manager().config_manager
+    buckets = config_manager.config[section]
+    # Adding needs the bucket to be absent, removing needs it present
+    if (bucket_name in buckets) == add:
+        return _error(failed_message.format(bucket_name))
+    if add:
+        buckets.append(bucket_name)
+    else:
+        buckets.remove(bucket_name)
+    if not config_manager.save_config():
+        return _SAVE_FAILED
+    return _ok(done_message.format(bucket_name))
+
+
+# Profile selected through the UI
+_CURRENT_PROFILE = {'name': os.environ.get('AWS_PROFILE', 'default')}
+
 
 def get_current_environment_info():
     """Get current environment information"""
-    current_profile = os.environ.get('AWS_PROFILE', 'default')
-    current_env = {
-        'profile': current_profile,
-        'environment': 'Unknown',
-        'region': 'N/A',
-        'role_arn': 'N/A',
-        'description': 'N/A'
+    manager = _get_manager()
+    # The environment manager is the one reader of [profile default], cached on the file
+    env_name = manager.environment_manager.get_current_environment()
+    env_config = manager.config_manager.get_environments().get(env_name) if env_name else None
+    if env_config is None:
+        return dict(_build_environment_info(_CURRENT_PROFILE['name']))
+    return dict(_build_environment_info(_CURRENT_PROFILE['name'], env_name, env_config['region'],
+                                        env_config['role_arn'], env_config.get('description', 'N/A')))
+
+
+@functools.lru_cache(maxsize=32)
+def _build_environment_info(profile, env_name=None, region='N/A', role_arn='N/A', description='N/A'):
+    """Build the environment info for a profile and its environment's details; callers get copies"""
+    return {
+        'profile': profile,
+        'environment': env_name.upper() if env_name else 'Unknown',
+        'region': region,
+        'role_arn': role_arn,
+        'description': description
     }
 
-    # Get config from manager
-    config = aws_manager.config_manager.config
-    config_path = Path.home() / '.aws' / 'config'
-
-    if config_path.exists():
-        config_parser = configparser.ConfigParser()
-        config_parser.read(config_path)
-
-        if 'profile default' in config_parser.sections():
-            profile_config = config_parser['profile default']
-            current_role = profile_config.get('role_arn', '')
-            current_region = profile_config.get('region', '')
-
-            # Find matching environment
-            for env_name, env_config in config.get('environments', {}).items():
-                if (env_config['role_arn'] == current_role and
-                        env_config['region'] == current_region):
-                    current_env.update({
-                        'environment': env_name.upper(),
-                        'region': env_config['region'],
-                        'role_arn': env_config['role_arn'],
-                        'description': env_config['description']
-                    })
-                    break
-
-    return current_env
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, falling back to Flask's encoder for unknown types"""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 def create_app():
     app = Flask(__name__, template_folder="../../templates")
-    app.secret_key = 'your-secret-key-here'
+    # The manager also sets up logging, so create it before anything logs
+    app.extensions['aws_manager'] = AWSProfileManager()
+    app.extensions['credentials_status'] = {}
+    _start_credentials_watcher(app)
+    # Set FLASK_SECRET_KEY so sessions survive restarts and are shared between workers
+    secret_key = os.environ.get('FLASK_SECRET_KEY')
+    if not secret_key:
+        logger.warning("FLASK_SECRET_KEY is not set; using a random key, sessions will reset on restart")
+        secret_key = secrets.token_hex(32)
+    app.secret_key = secret_key
+    # Not marked Secure: the UI is served over plain http on localhost
+    app.config.update(SESSION_COOKIE_HTTPONLY=True, SESSION_COOKIE_SAMESITE='Lax')
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    # Responses are read by our own JS, so skip key sorting and debug pretty-printing
+    app.json.sort_keys = False
+    app.json.compact = True
+
+    # Compile page templates up front instead of on each page's first request
+    for name in PAGE_TEMPLATES:
+        app.jinja_env.get_template(name)
+
+    # Answer /api/foo/ like /api/foo rather than with a redirect; rules pick
+    # this up when they're added, so it has to be set before the routes below
+    app.url_map.strict_slashes = False
 
     # Initialize session manager for credential management
     session_manager = SessionManager(app)
+
+    @app.errorhandler(Exception)
+    def handle_unexpected_error(e):
+        """Return a JSON error for anything a view doesn't handle itself"""
+        if isinstance(e, HTTPException):
+            return e
+        logger.exception("Error handling %s: %s", request.path, e)
+        return _error(str(e)), 500
+
+    @app.after_request
+    def invalidate_status_after_mutation(response):
+        """Drop cached status once a request may have changed it"""
+        if request.method != 'GET':
+            _invalidate_status_cache()
+        return response
+
+    @app.after_request
+    def add_etag(response):
+        """Let clients revalidate status and page responses with If-None-Match"""
+        if (request.method == 'GET' and request.endpoint in ETAG_ENDPOINTS
+                and response.status_code == 200 and not response.direct_passthrough):
+            response.add_etag(weak=True)
+            response.make_conditional(request)
+        return response
     
     @app.route('/')
+    @_safe('index.html', environments={}, current_profile='None', current_env={},
+           credentials_status={}, base_credentials_path='', status={})
     def index():
-        try:
-            status = aws_manager.get_status()
-            current_profile = status.get('current_profile', 'None')
-            current_env = get_current_environment_info()
-            credentials_status = aws_manager.get_credentials_status()
-            environments = aws_manager.list_environments()
-            base_credentials_path = aws_manager.config_manager.get_base_credentials_path()
-            
-            return render_template('index.html', 
-                                 environments=environments, 
-                                 current_profile=current_profile,
-                                 current_env=current_env,
-                                 credentials_status=credentials_status,
-                                 base_credentials_path=base_credentials_path,
-                                 status=status)
-        except Exception as e:
-            logger.error(f'Error in index: {e}')
-            return render_template('index.html', 
-                                 environments={}, 
-                                 current_profile='None',
-                                 current_env={},
-                                 credentials_status={},
-                                 base_credentials_path='',
-                                 status={})
+        manager = _get_manager()
+        status = _get_cached_status('status', manager.get_status)
+        current_profile = status.get('current_profile', 'None')
+        current_env = get_current_environment_info()
+        credentials_status = _get_credentials_status()
+        environments = status['environments']
+        base_credentials_path = manager.config_manager.get_base_credentials_path()
+        
+        return render_template('index.html', 
+                             environments=environments, 
+                             current_profile=current_profile,
+                             current_env=current_env,
+                             credentials_status=credentials_status,
+                             base_credentials_path=base_credentials_path,
+                             status=status)
     
     @app.route('/profiles')
+    @_safe('profiles.html', profiles={}, current_profile=None, credentials_profiles={})
     def profiles():
-        try:
-            profiles = aws_manager.list_profiles()
-            status = aws_manager.get_status()
-            credentials_profiles = aws_manager.config_manager.get_credentials_profiles()
-            return render_template('profiles.html', 
-                                 profiles=profiles, 
-                                 current_profile=status['current_profile'],
-                                 credentials_profiles=credentials_profiles)
-        except Exception as e:
-            logger.error(f'Error in profiles: {e}')
-            return render_template('profiles.html', 
-                                 profiles={}, 
-                                 current_profile=None,
-                                 credentials_profiles={})
+        manager = _get_manager()
+        status = _get_cached_status('status', manager.get_status)
+        profiles = status['profiles']
+        credentials_profiles = manager.config_manager.get_credentials_profiles()
+        return render_template('profiles.html', 
+                             profiles=profiles, 
+                             current_profile=status['current_profile'],
+                             credentials_profiles=credentials_profiles)
     
     @app.route('/environments')
+    @_safe('environments.html', environments={}, current_env={})
     def environments():
-        try:
-            environments = aws_manager.list_environments()
-            current_env = get_current_environment_info()
-            return render_template('environments.html', 
-                                 environments=environments, 
-                                 current_env=current_env)
-        except Exception as e:
-            logger.error(f'Error in environments: {e}')
-            return render_template('environments.html', environments={}, current_env={})
+        environments = _get_cached_status('environments', _get_manager().list_environments)
+        current_env = get_current_environment_info()
+        return render_template('environments.html', 
+                             environments=environments, 
+                             current_env=current_env)
     
     @app.route('/credentials')
+    @_safe('credentials.html', status={}, credentials_status=_EMPTY_CREDENTIALS_STATUS,
+           base_credentials_path='')
     def credentials():
-        try:
-            status = aws_manager.get_status()
-            credentials_status = aws_manager.get_credentials_status()
-            base_credentials_path = aws_manager.config_manager.get_base_credentials_path()
-            return render_template('credentials.html', 
-                                 status=status, 
-                                 credentials_status=credentials_status,
-                                 base_credentials_path=base_credentials_path)
-        except Exception as e:
-            logger.error(f'Error in credentials: {e}')
-            return render_template('credentials.html', 
-                                 status={}, 
-                                 credentials_status={
-                                     'base_file_exists': False,
-                                     'default_profile_valid': False,
-                                     'infrrd_master_valid': False,
-                                     'in_sync': False,
-                                     'base_access_key': 'N/A',
-                                     'default_access_key': 'N/A',
-                                     'infrrd_access_key': 'N/A'
-                                 },
-                                 base_credentials_path='')
+        manager = _get_manager()
+        status = _get_cached_status('status', manager.get_status)
+        credentials_status = _get_credentials_status()
+        base_credentials_path = manager.config_manager.get_base_credentials_path()
+        return render_template('credentials.html', 
+                             status=status, 
+                             credentials_status=credentials_status,
+                             base_credentials_path=base_credentials_path)
     
     @app.route('/s3')
+    @_safe('s3.html')
     def s3():
-        try:
-            return render_template('s3.html')
-        except Exception as e:
-            logger.error(f'Error in s3: {e}')
-            return render_template('s3.html')
+        return render_template('s3.html')
 
     @app.route('/efs')
+    @_safe('efs.html', mongo_configs=[])
     def efs():
-        try:
-            mongo_configs = aws_manager.config_manager.get_mongo_configs()
-            return render_template('efs.html', mongo_configs=mongo_configs)
-        except Exception as e:
-            logger.error(f'Error in efs: {e}')
-            return render_template('efs.html', mongo_configs=[])
+        mongo_configs = _get_manager().config_manager.get_mongo_configs()
+        return render_template('efs.html', mongo_configs=mongo_configs)
     
     @app.route('/mongo')
+    @_safe('mongo.html', mongo_configs=[])
     def mongo():
-        try:
-            mongo_configs = aws_manager.config_manager.get_mongo_configs()
-            return render_template('mongo.html', mongo_configs=mongo_configs)
-        except Exception as e:
-            logger.error(f'Error in mongo UI: {e}')
-            return render_template('mongo.html', mongo_configs=[])
+        mongo_configs = _get_manager().config_manager.get_mongo_configs()
+        return render_template('mongo.html', mongo_configs=mongo_configs)
     
     @app.route('/assume-role-page')
+    @_safe('assume_role.html', assume_role_configs={})
     def assume_role_page():
-        try:
-            assume_role_configs = aws_manager.config_manager.get_assume_role_configs()
-            return render_template('assume_role.html', assume_role_configs=assume_role_configs)
-        except Exception as e:
-            logger.error(f'Error in assume role page: {e}')
-            return render_template('assume_role.html', assume_role_configs={})
+        assume_role_configs = _get_manager().config_manager.get_assume_role_configs()
+        return render_template('assume_role.html', assume_role_configs=assume_role_configs)
     
     
     # API Endpoints
     @app.route('/api/switch_profile', methods=['POST'])
     def api_switch_profile():
         """API endpoint to switch profile"""
-        try:
-            data = request.get_json()
-            profile_name = data.get('profile_name')
-            
-            if not profile_name:
-                return jsonify({'success': False, 'message': 'Profile name is required'})
-            
-            result = aws_manager.switch_profile(profile_name)
-            
-            if result:
-                return jsonify({'success': True, 'message': f'Switched to {profile_name} profile'})
-            else:
-                return jsonify({'success': False, 'message': f'Failed to switch to {profile_name} profile'})
-                
-        except Exception as e:
-            logger.error(f"Error switching profile: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('profile_name')
+        profile_name = data.get('profile_name')
+        
+        if missing:
+            return _NEED_PROFILE_NAME
+        
+        result = _get_manager().switch_profile(profile_name)
+        
+        if result:
+            _CURRENT_PROFILE['name'] = profile_name
+            return _ok(f'Switched to {profile_name} profile')
+        else:
+            return _error(f'Failed to switch to {profile_name} profile')
 
     @app.route('/api/switch_environment', methods=['POST'])
     def api_switch_environment():
         """API endpoint to switch environment"""
-        try:
-            data = request.get_json()
-            env_name = data.get('env_name')
-            
-            if not env_name:
-                return jsonify({'success': False, 'message': 'Environment name is required'})
-            
-            # Clear any existing assumed role credentials first
-            if 'assumed_credentials' in session:
-                logger.info("Clearing existing assumed role before environment switch")
-                session_manager.clear_assumed_credentials()
-            
-            result = aws_manager.switch_environment(env_name)
-            
-            if result:
-                # Force boto3 to reload credentials by clearing the credential cache
-                import boto3
-                boto3.setup_default_session()
-                logger.info("Cleared boto3 session cache to reload credentials")
-                
-                return jsonify({
-                    'success': True, 
-                    'message': f'Switched to {env_name.upper()} environment. Credentials reloaded.',
-                    'requires_reload': True
-                })
-            else:
-                return jsonify({'success': False, 'message': f'Failed to switch to {env_name} environment'})
-                
-        except Exception as e:
-            logger.error(f"Error switching environment: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('env_name')
+        env_name = data.get('env_name')
+        
+        if missing:
+            return _error('Environment name is required')
+        
+        # Clear any existing assumed role credentials first
+        if session_manager.get_session_info()['session_credentials_active']:
+            logger.info("Clearing existing assumed role before environment switch")
+            session_manager.clear_assumed_credentials()
+        
+        result = _get_manager().switch_environment(env_name)
+        
+        if result:
+            # Cached AWS clients were dropped by the manager and pick up the new credentials on next use
+            return jsonify({
+                'success': True, 
+                'message': f'Switched to {env_name.upper()} environment. Credentials reloaded.',
+                'requires_reload': True
+            })
+        else:
+            return _error(f'Failed to switch to {env_name} environment')
 
     @app.route('/api/sync_credentials', methods=['POST'])
     def api_sync_credentials():
         """API endpoint to sync credentials"""
-        try:
-            result = aws_manager.sync_credentials()
-            return jsonify({'success': result, 'message': 'Credentials synced successfully' if result else 'Failed to sync credentials'})
-        except Exception as e:
-            logger.error(f"Error syncing credentials: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        job_id = _submit_job(_get_manager().sync_credentials, 'Credentials synced successfully', 'Failed to sync credentials')
+        return jsonify({'success': True, 'message': 'Credential sync started', 'job_id': job_id}), 202
+
+    @app.route('/api/job/<job_id>', methods=['GET'])
+    def api_job_status(job_id):
+        """API endpoint to poll a background job"""
+        future = _get_job(job_id)
+        if future is None:
+            return jsonify({'success': False, 'done': True, 'message': f'Job {job_id} not found'})
+        if not future.done():
+            return jsonify({'success': True, 'done': False})
+        return jsonify({'done': True, **future.result()})
+
+    @app.route('/api/job/<job_id>/events', methods=['GET'])
+    def api_job_events(job_id):
+        """API endpoint streaming a background job's outcome as Server-Sent Events"""
+        future = _get_job(job_id)
+
+        def stream():
+            if future is None:
+                result = {'success': False, 'done': True, 'message': f'Job {job_id} not found'}
+            else:
+                deadline = time.monotonic() + JOB_STREAM_TIMEOUT
+                result = {'success': True, 'done': False}
+                while time.monotonic() < deadline:
+                    try:
+                        result = {'done': True, **future.result(timeout=JOB_STREAM_HEARTBEAT)}
+                        break
+                    except FutureTimeoutError:
+                        yield ': keep-alive\n\n'
+            yield f'data: {json.dumps(result)}\n\n'
+
+        return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
     @app.route('/api/update_base_credentials_path', methods=['POST'])
     def api_update_base_credentials_path():
         """API endpoint to update base credentials file path"""
-        try:
-            data = request.get_json()
-            new_path = data.get('base_credentials_path')
-
-            if not new_path:
-                return jsonify({'success': False, 'message': 'Base credentials path is required'})
+        data, missing = _json('base_credentials_path')
+        new_path = data.get('base_credentials_path')
 
-            # Update config
-            config = aws_manager.config_manager.config
-            config['base_credentials_path'] = new_path
-            aws_manager.config_manager.save_config()
+        if missing:
+            return _error('Base credentials path is required')
 
-            return jsonify({'success': True, 'message': f'Base credentials path updated to: {new_path}'})
+        # Update config
+        config_manager = _get_manager().config_manager
+        config_manager.config['base_credentials_path'] = new_path
+        if not config_manager.save_config():
+            return _SAVE_FAILED
 
-        except Exception as e:
-            logger.error(f"Error updating base credentials path: {e}")
-            return jsonify({'success': False, 'message': f'Error: {str(e)}'})
+        return _ok(f'Base credentials path updated to: {new_path}')
 
     @app.route('/api/force_refresh', methods=['POST'])
     def api_force_refresh():
         """API endpoint to force refresh credentials"""
-        try:
-            # Force sync credentials from base file
-            result = aws_manager.sync_credentials()
-            return jsonify({'success': result, 'message': 'Credentials refreshed successfully' if result else 'Failed to refresh credentials'})
-        except Exception as e:
-            logger.error(f"Error force refreshing credentials: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        # Force sync credentials from base file
+        job_id = _submit_job(_get_manager().sync_credentials, 'Credentials refreshed successfully', 'Failed to refresh credentials')
+        return jsonify({'success': True, 'message': 'Credential refresh started', 'job_id': job_id}), 202
 
     @app.route('/api/clean_config', methods=['POST'])
     def api_clean_config():
         """API endpoint to clean config file"""
-        try:
-            # This would clean up the AWS config file to have only one active environment
-            config_path = Path.home() / '.aws' / 'config'
-            
-            if config_path.exists():
-                config_parser = configparser.ConfigParser()
-                config_parser.read(config_path)
-                
-                # Remove all profile sections except default
-                sections_to_remove = [section for section in config_parser.sections() if section.startswith('profile ') and section != 'profile default']
-                for section in sections_to_remove:
+        # This would clean up the AWS config file to have only one active environment
+        config_path = AWS_CONFIG_PATH
+        removed = 0
+
+        if config_path.exists():
+            config_parser = _get_config_parser()
+            config_parser.read(config_path)
+
+            # Remove all profile sections except default in a single pass
+            for section in config_parser.sections():
+                if section[:8] == 'profile ' and section not in KEEP_PROFILE_SECTIONS:
                     config_parser.remove_section(section)
-                
-                # Write back the cleaned config
-                with open(config_path, 'w') as f:
-                    config_parser.write(f)
-            
-            return jsonify({'success': True, 'message': 'Config file cleaned successfully'})
-        except Exception as e:
-            logger.error(f"Error cleaning config: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+                    removed += 1
+
+        if not removed:
+            return jsonify({'success': True, 'message': 'Config file is already clean', 'removed': 0})
+
+        # Write back the cleaned config atomically so a concurrent reader never sees a partial file
+        buf = io.StringIO()
+        config_parser.write(buf)
+        atomic_write(config_path, buf.getvalue())
+
+        return jsonify({
+            'success': True,
+            'message': f'Config file cleaned successfully ({removed} profile sections removed)',
+            'removed': removed
+        })
+
+    def _build_status():
+        """Build the status payload shared by /api/status and /api/bootstrap"""
+        status = dict(_get_cached_status('status', _get_manager().get_status))
+
+        # Add session information using session manager
+        session_info = session_manager.get_session_info()
+
+        # Determine the correct current profile
+        # Assumed credentials don't replace the profile, so this is the selected one either way
+        status['current_profile'] = _CURRENT_PROFILE['name']
+
+        # Determine the correct current environment
+        # If we have assumed credentials, try to get environment from session info
+        current_environment = status.get('current_environment')
+        if session_info.get('session_credentials_active') and session_info.get('assumed_role'):
+            # When role is assumed, show the role name as environment
+            current_environment = session_info['assumed_role']
+        elif current_environment is None:
+            current_environment = 'Unknown'
+
+        # Override the environment in status
+        status['current_environment'] = current_environment
+
+        # Add the credentials AWS clients see for debugging
+        session_creds = get_session_credentials()
+        if session_creds is not None:
+            access_key_id, profile, has_session_token = session_creds['AccessKeyId'], None, True
+        else:
+            access_key_id = os.environ.get('AWS_ACCESS_KEY_ID')
+            profile = os.environ.get('AWS_PROFILE')
+            has_session_token = bool(os.environ.get('AWS_SESSION_TOKEN'))
+        # Summarized without exposing secrets
+        env_info = {
+            'AWS_ACCESS_KEY_ID': access_key_id[:10] + '...' if access_key_id else 'Not set',
+            'AWS_PROFILE': profile or 'Not set',
+            'AWS_SESSION_TOKEN': 'Set' if has_session_token else 'Not set'
+        }
+
+        status.update({
+            'session': session_info,
+            'environment': env_info,
+            'success': True
+        })
+        return status
 
     @app.route('/api/status', methods=['GET'])
     def api_status():
         """API endpoint to get status"""
-        try:
-            status = aws_manager.get_status()
-
-            # Add session information using session manager
-            session_info = session_manager.get_session_info()
-
-            # Determine the correct current profile
-            # If we have assumed credentials, use the original profile that was stored
-            # Otherwise, use the current AWS_PROFILE environment variable
-            current_profile = status.get('current_profile', 'default')
-            if session_info.get('session_credentials_active'):
-                # When role is assumed, get the original profile from session manager
-                if hasattr(session_manager.app, '_original_aws_profile'):
-                    current_profile = session_manager.app._original_aws_profile
-                else:
-                    # Fallback to default if no original profile stored
-                    current_profile = 'default'
-            else:
-                # No assumed credentials, use current AWS_PROFILE or default
-                current_profile = os.environ.get('AWS_PROFILE', 'default')
-
-            # Override the profile in status
-            status['current_profile'] = current_profile
-
-            # Determine the correct current environment
-            # If we have assumed credentials, try to get environment from session info
-            current_environment = status.get('current_environment')
-            if session_info.get('session_credentials_active') and session_info.get('assumed_role'):
-                # When role is assumed, show the role name as environment
-                current_environment = session_info['assumed_role']
-            elif current_environment is None:
-                current_environment = 'Unknown'
-
-            # Override the environment in status
-            status['current_environment'] = current_environment
-
-            # Add current environment variables for debugging
-            env_info = {
-                'AWS_ACCESS_KEY_ID': os.environ.get('AWS_ACCESS_KEY_ID', 'Not set')[:10] + '...' if os.environ.get('AWS_ACCESS_KEY_ID') else 'Not set',
-                'AWS_PROFILE': os.environ.get('AWS_PROFILE', 'Not set'),
-                'AWS_SESSION_TOKEN': 'Set' if os.environ.get('AWS_SESSION_TOKEN') else 'Not set'
-            }
-
-            status.update({
-                'session': session_info,
-                'environment': env_info,
-                'success': True
-            })
-            return jsonify(status)
-        except Exception as e:
-            logger.error(f"Error getting status: {e}")
-            return jsonify({'error': str(e)})
-    
-
+        return jsonify(_build_status())
+
+    @app.route('/api/bootstrap', methods=['GET'])
+    def api_bootstrap():
+        """API endpoint to get all dashboard data in a single round-trip"""
+        status = _build_status()
+        return jsonify({
+            'success': True,
+            'status': status,
+            'current_env': get_current_environment_info(),
+            'credentials_status': _get_credentials_status(),
+            'environments': status['environments'],
+            'base_credentials_path': _get_manager().config_manager.get_base_credentials_path()
+        })
 
     @app.route('/api/update_credentials', methods=['POST'])
     def api_update_credentials():
         """API endpoint to update credentials"""
-        try:
-            data = request.get_json()
-            profile_name = data.get('profile_name', 'default')
-            access_key = data.get('access_key')
-            secret_key = data.get('secret_key')
-            session_token = data.get('session_token', '')
+        data, missing = _json('access_key', 'secret_key')
+        profile_name = data.get('profile_name', 'default')
+        access_key = data.get('access_key')
+        secret_key = data.get('secret_key')
+        session_token = data.get('session_token', '')
 
-            if not access_key or not secret_key:
-                return jsonify({'success': False, 'message': 'Access Key ID and Secret Access Key are required'})
+        if missing:
+            return _error('Access Key ID and Secret Access Key are required')
 
-            result = aws_manager.save_credentials(profile_name, access_key, secret_key, session_token)
-            
-            if result:
-                return jsonify({'success': True, 'message': f'Credentials for {profile_name} updated successfully'})
-            else:
-                return jsonify({'success': False, 'message': f'Failed to update credentials for {profile_name}'})
-                
-        except Exception as e:
-            logger.error(f"Error updating credentials: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().save_credentials(profile_name, access_key, secret_key, session_token)
+        
+        if result:
+            return _ok(f'Credentials for {profile_name} updated successfully')
+        else:
+            return _error(f'Failed to update credentials for {profile_name}')
 
     @app.route('/api/create_role_profile', methods=['POST'])
     def api_create_role_profile():
         """API endpoint to create role-based profile"""
-        try:
-            data = request.get_json()
-            profile_name = data.get('profile_name')
-            role_arn = data.get('role_arn')
-            source_profile = data.get('source_profile', 'infrrd-master')
-            region = data.get('region', 'us-east-1')
+        data, missing = _json('profile_name', 'role_arn')
+        profile_name = data.get('profile_name')
+        role_arn = data.get('role_arn')
+        source_profile = data.get('source_profile', 'infrrd-master')
+        region = data.get('region', 'us-east-1')
 
-            if not profile_name or not role_arn:
-                return jsonify({'success': False, 'message': 'Profile name and role ARN are required'})
+        if missing:
+            return _error('Profile name and role ARN are required')
 
-            result = aws_manager.save_role_profile(profile_name, role_arn, source_profile)
-            
-            if result:
-                return jsonify({'success': True, 'message': f'Role profile {profile_name} created successfully'})
-            else:
-                return jsonify({'success': False, 'message': f'Failed to create role profile {profile_name}'})
-                
-        except Exception as e:
-            logger.error(f"Error creating role profile: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().save_role_profile(profile_name, role_arn, source_profile)
+        
+        if result:
+            return _ok(f'Role profile {profile_name} created successfully')
+        else:
+            return _error(f'Failed to create role profile {profile_name}')
 
     @app.route('/api/add_credential_profile', methods=['POST'])
     def api_add_credential_profile():
         """API endpoint to add a new credential profile to config"""
-        try:
-            data = request.get_json()
-            profile_name = data.get('profile_name')
-            description = data.get('description', '')
-
-            if not profile_name:
-                return jsonify({'success': False, 'message': 'Profile name is required'})
-
-            # Update config
-            config = aws_manager.config_manager.config
-            if 'credentials_profiles' not in config:
-                config['credentials_profiles'] = {}
-            
-            config['credentials_profiles'][profile_name] = {
-                'type': 'credentials',
-                'description': description
-            }
-            
-            result = aws_manager.config_manager.save_config()
-            
-            if result:
-                return jsonify({'success': True, 'message': f'Credential profile {profile_name} added to configuration'})
-            else:
-                return jsonify({'success': False, 'message': f'Failed to save configuration'})
-                
-        except Exception as e:
-            logger.error(f"Error adding credential profile: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('profile_name')
+        profile_name = data.get('profile_name')
+        description = data.get('description', '')
+
+        if missing:
+            return _NEED_PROFILE_NAME
+
+        # Update config
+        result = _mutate_config('credentials_profiles', profile_name, {
+            'type': 'credentials',
+            'description': description
+        })
+        
+        if result:
+            return _ok(f'Credential profile {profile_name} added to configuration')
+        else:
+            return _SAVE_FAILED
 
     @app.route('/api/remove_config_profile', methods=['POST'])
     def api_remove_config_profile():
         """API endpoint to remove a credential profile from config"""
-        try:
-            data = request.get_json()
-            profile_name = data.get('profile_name')
+        data, missing = _json('profile_name')
+        profile_name = data.get('profile_name')
 
-            if not profile_name:
-                return jsonify({'success': False, 'message': 'Profile name is required'})
+        if missing:
+            return _NEED_PROFILE_NAME
 
-            # Update config
-            config = aws_manager.config_manager.config
-            if 'credentials_profiles' in config and profile_name in config['credentials_profiles']:
-                del config['credentials_profiles'][profile_name]
-                result = aws_manager.config_manager.save_config()
-                
-                if result:
-                    return jsonify({'success': True, 'message': f'Credential profile {profile_name} removed from configuration'})
-                else:
-                    return jsonify({'success': False, 'message': f'Failed to save configuration'})
+        # Update config
+        if profile_name in _get_manager().config_manager.get_credentials_profiles():
+            result = _mutate_config('credentials_profiles', profile_name, None)
+            
+            if result:
+                return _ok(f'Credential profile {profile_name} removed from configuration')
             else:
-                return jsonify({'success': False, 'message': f'Profile {profile_name} not found in configuration'})
-                
-        except Exception as e:
-            logger.error(f"Error removing credential profile: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+                return _SAVE_FAILED
+        else:
+            return _error(f'Profile {profile_name} not found in configuration')
 
 
     @app.route('/api/add_environment', methods=['POST'])
     def api_add_environment():
         """API endpoint to add a new environment"""
-        try:
-            data = request.get_json()
-            env_name = data.get('env_name')
-            region = data.get('region', 'us-east-1')
-            role_arn = data.get('role_arn')
-            description = data.get('description', '')
-
-            if not env_name or not role_arn:
-                return jsonify({'success': False, 'message': 'Environment name and role ARN are required'})
-
-            # Update config
-            config = aws_manager.config_manager.config
-            if 'environments' not in config:
-                config['environments'] = {}
-            
-            config['environments'][env_name] = {
+        data, missing = _json('env_name', 'role_arn')
+        env_name = data.get('env_name')
+        region = data.get('region', 'us-east-1')
+        role_arn = data.get('role_arn')
+        description = data.get('description', '')
+
+        if missing:
+            return _error('Environment name and role ARN are required')
+
+        # Update config
+        result = _mutate_config('environments', env_name, {
+            'region': region,
+            'role_arn': role_arn,
+            'description': description
+        })
+        
+        if result:
+            return _ok(f'Environment {env_name} added successfully')
+        else:
+            return _SAVE_FAILED
+
+    @app.route('/api/update_environment', methods=['POST'])
+    def api_update_environment():
+        """API endpoint to update an existing environment"""
+        data, missing = _json('env_name', 'role_arn')
+        env_name = data.get('env_name')
+        region = data.get('region', 'us-east-1')
+        role_arn = data.get('role_arn')
+        description = data.get('description', '')
+
+        if missing:
+            return _error('Environment name and role ARN are required')
+
+        # Update config
+        if env_name in _get_manager().config_manager.get_environments():
+            result = _mutate_config('environments', env_name, {
                 'region': region,
                 'role_arn': role_arn,
                 'description': description
-            }
-            
-            result = aws_manager.config_manager.save_config()
+            })
             
             if result:
-                return jsonify({'success': True, 'message': f'Environment {env_name} added successfully'})
+                return _ok(f'Environment {env_name} updated successfully')
             else:
-                return jsonify({'success': False, 'message': f'Failed to save configuration'})
-                
-        except Exception as e:
-            logger.error(f"Error adding environment: {e}")
-            return jsonify({'success': False, 'message': str(e)})
-
-    @app.route('/api/update_environment', methods=['POST'])
-    def api_update_environment():
-        """API endpoint to update an existing environment"""
-        try:
-            data = request.get_json()
-            env_name = data.get('env_name')
-            region = data.get('region', 'us-east-1')
-            role_arn = data.get('role_arn')
-            description = data.get('description', '')
-
-            if not env_name or not role_arn:
-                return jsonify({'success': False, 'message': 'Environment name and role ARN are required'})
-
-            # Update config
-            config = aws_manager.config_manager.config
-            if 'environments' in config and env_name in config['environments']:
-                config['environments'][env_name] = {
-                    'region': region,
-                    'role_arn': role_arn,
-                    'description': description
-                }
-                
-                result = aws_manager.config_manager.save_config()
-                
-                if result:
-                    return jsonify({'success': True, 'message': f'Environment {env_name} updated successfully'})
-                else:
-                    return jsonify({'success': False, 'message': f'Failed to save configuration'})
-            else:
-                return jsonify({'success': False, 'message': f'Environment {env_name} not found'})
-                
-        except Exception as e:
-            logger.error(f"Error updating environment: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+                return _SAVE_FAILED
+        else:
+            return _error(f'Environment {env_name} not found')
 
     @app.route('/api/remove_environment', methods=['POST'])
     def api_remove_environment():
         """API endpoint to remove an environment"""
-        try:
-            data = request.get_json()
-            env_name = data.get('env_name')
+        data, missing = _json('env_name')
+        env_name = data.get('env_name')
 
-            if not env_name:
-                return jsonify({'success': False, 'message': 'Environment name is required'})
+        if missing:
+            return _error('Environment name is required')
 
-            # Update config
-            config = aws_manager.config_manager.config
-            if 'environments' in config and env_name in config['environments']:
-                del config['environments'][env_name]
-                result = aws_manager.config_manager.save_config()
-                
-                if result:
-                    return jsonify({'success': True, 'message': f'Environment {env_name} removed successfully'})
-                else:
-                    return jsonify({'success': False, 'message': f'Failed to save configuration'})
+        # Update config
+        if env_name in _get_manager().config_manager.get_environments():
+            result = _mutate_config('environments', env_name, None)
+            
+            if result:
+                return _ok(f'Environment {env_name} removed successfully')
             else:
-                return jsonify({'success': False, 'message': f'Environment {env_name} not found'})
-                
-        except Exception as e:
-            logger.error(f"Error removing environment: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+                return _SAVE_FAILED
+        else:
+            return _error(f'Environment {env_name} not found')
 
     def _update_shell_profile(enabled=True):
         """Helper to update shell profiles (.zshrc, .bashrc) with Bedrock source command"""
@@ -590,1188 +935,890 @@ def create_app():
                 
                 if enabled:
                     if managed_block_start in content:
-                        logger.info(f"Bedrock source already in {profile_path.name}")
+                        logger.info("Bedrock source already in %s", profile_path.name)
                         updated_any = True
                         continue
                     
                     # Add at the end
                     new_block = f"\n{managed_block_start}\n# Bedrock Toggle: Enabled\n{source_line}\n{managed_block_end}\n"
                     profile_path.write_text(content + new_block)
-                    logger.info(f"Added Bedrock source to {profile_path.name}")
+                    logger.info("Added Bedrock source to %s", profile_path.name)
                     updated_any = True
                 else:
                     if managed_block_start in content:
                         # Remove the block
-                        import re
                         pattern = r"\n?" + re.escape(managed_block_start) + r".*?" + re.escape(managed_block_end) + r"\n?"
                         new_content = re.sub(pattern, "\n", content, flags=re.DOTALL)
                         profile_path.write_text(new_content.strip() + "\n")
-                        logger.info(f"Removed Bedrock source from {profile_path.name}")
+                        logger.info("Removed Bedrock source from %s", profile_path.name)
                         updated_any = True
                     else:
-                        logger.info(f"Bedrock source not found in {profile_path.name}, nothing to remove")
+                        logger.info("Bedrock source not found in %s, nothing to remove", profile_path.name)
             except Exception as e:
-                logger.error(f"Error updating {profile_path.name}: {e}")
+                logger.error("Error updating %s: %s", profile_path.name, e)
         
         return updated_any
 
     @app.route('/api/bedrock_status', methods=['GET'])
     def api_bedrock_status():
         """API endpoint to check Bedrock toggle status"""
-        try:
-            zshrc_path = Path.home() / '.zshrc'
-            enabled = False
-            if zshrc_path.exists():
-                content = zshrc_path.read_text()
-                enabled = "# >>> Managed by AWS Profile Manager >>>" in content
-            
-            # Also check if current env is dev
-            status = aws_manager.get_status()
-            current_env = status.get('current_environment', '').lower()
-            
-            return jsonify({
-                'success': True,
-                'enabled': enabled,
-                'current_env': current_env
-            })
-        except Exception as e:
-            logger.error(f"Error getting Bedrock status: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        zshrc_path = Path.home() / '.zshrc'
+        enabled = False
+        if zshrc_path.exists():
+            content = zshrc_path.read_text()
+            enabled = "# >>> Managed by AWS Profile Manager >>>" in content
+        
+        # Also check if current env is dev
+        status = _get_cached_status('status', _get_manager().get_status)
+        current_env = status.get('current_environment', '').lower()
+        
+        return jsonify({
+            'success': True,
+            'enabled': enabled,
+            'current_env': current_env
+        })
 
     @app.route('/api/efs/download_local', methods=['POST'])
     def api_efs_download_local():
         """API endpoint to download EFS folder/file directly to local Downloads folder"""
-        try:
-            data = request.get_json() or {}
-            remote_path = data.get('remote_path')
-            conn_id = int(data.get('connection_id', 0))
-            is_folder = data.get('is_folder') == 'true'
-            
-            if not remote_path:
-                return jsonify({'success': False, 'message': 'Remote path is required'})
-            
-            # Use ~/Downloads as default browser path
-            downloads_dir = os.path.join(os.path.expanduser('~'), 'Downloads')
-            base_name = os.path.basename(remote_path)
-            local_dest = os.path.join(downloads_dir, base_name)
-            
-            # Handle duplicates by adding suffix if needed
-            counter = 1
-            original_local_dest = local_dest
-            while os.path.exists(local_dest):
-                local_dest = f"{original_local_dest}_{counter}"
-                counter += 1
-            
-            if is_folder:
-                result = aws_manager.download_efs_recursive(remote_path, conn_id, local_dest)
-            else:
-                result = aws_manager.download_efs_file(remote_path, local_dest, conn_id)
-                
-            if result.get('success'):
-                # Open in Finder
-                import subprocess
-                subprocess.run(['open', local_dest])
-                return jsonify({'success': True, 'message': f'Downloaded to {local_dest} and opened in Finder'})
-            else:
-                return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error in local download: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('remote_path')
+        remote_path = data.get('remote_path')
+        conn_id = int(data.get('connection_id', 0))
+        is_folder = data.get('is_folder') == 'true'
+        
+        if missing:
+            return _NEED_REMOTE_PATH
+        
+        # Use ~/Downloads as default browser path
+        downloads_dir = os.path.join(os.path.expanduser('~'), 'Downloads')
+        base_name = os.path.basename(remote_path)
+        local_dest = os.path.join(downloads_dir, base_name)
+        
+        # Handle duplicates by adding suffix if needed
+        counter = 1
+        original_local_dest = local_dest
+        while os.path.exists(local_dest):
+            local_dest = f"{original_local_dest}_{counter}"
+            counter += 1
+        
+        if is_folder:
+            result = _get_manager().download_efs_recursive(remote_path, conn_id, local_dest)
+        else:
+            result = _get_manager().download_efs_file(remote_path, local_dest, conn_id)
+            
+        if result.get('success'):
+            # Open in Finder
+            subprocess.run(['open', local_dest])
+            return _ok(f'Downloaded to {local_dest} and opened in Finder')
+        else:
+            return jsonify(result)
 
     @app.route('/api/toggle_bedrock', methods=['POST'])
     def api_toggle_bedrock():
         """API endpoint to toggle Bedrock configuration"""
-        try:
-            data = request.get_json()
-            enabled = data.get('enabled', False)
-            
-            if enabled:
-                # 1. Switch environment to 'dev' forcefully first
-                status = aws_manager.get_status()
-                current_env = status.get('current_environment', 'default')
-                
-                # Switch to dev
-                result = aws_manager.switch_environment('dev')
-                if not result:
-                    return jsonify({
-                        'success': False, 
-                        'message': 'Failed to switch to DEV environment. Bedrock toggle cancelled.',
-                        'enabled': False
-                    })
-                
-                # Store previous environment in session for reverting
-                if current_env.lower() != 'dev':
-                    session['prev_env'] = current_env
-                
-                # 2. Update shell profile for "permanent session"
-                profile_updated = _update_shell_profile(True)
-                if not profile_updated:
-                    return jsonify({
-                        'success': False, 
-                        'message': 'Switched to DEV, but failed to update .zshrc. Bedrock toggle not fully active.',
-                        'enabled': False
-                    })
-                
+        data, _ = _json()
+        enabled = data.get('enabled', False)
+        
+        if enabled:
+            manager = _get_manager()
+            # 1. Switch environment to 'dev' forcefully first
+            status = manager.get_status()
+            current_env = status.get('current_environment', 'default')
+            
+            # Switch to dev
+            result = manager.switch_environment('dev')
+            if not result:
                 return jsonify({
-                    'success': True,
-                    'message': 'Bedrock enabled! Switched to DEV environment and updated .zshrc.',
-                    'enabled': True
+                    'success': False, 
+                    'message': 'Failed to switch to DEV environment. Bedrock toggle cancelled.',
+                    'enabled': False
                 })
-            else:
-                # Disable Bedrock
-                # 1. Update shell profile
-                profile_updated = _update_shell_profile(False)
-                
-                # 2. Revert environment
-                revert_to = session.get('prev_env', 'default')
-                env_reverted = aws_manager.switch_environment(revert_to)
-                
-                message = "Bedrock disabled and .zshrc updated."
-                if env_reverted:
-                    message += f" Reverted to {revert_to} environment."
-                else:
-                    message += " Failed to revert environment."
-                
+            
+            # Store previous environment in session for reverting
+            if current_env.lower() != 'dev':
+                session['prev_env'] = current_env
+            
+            # 2. Update shell profile for "permanent session"
+            profile_updated = _update_shell_profile(True)
+            if not profile_updated:
                 return jsonify({
-                    'success': True,
-                    'message': message,
+                    'success': False, 
+                    'message': 'Switched to DEV, but failed to update .zshrc. Bedrock toggle not fully active.',
                     'enabled': False
                 })
-        except Exception as e:
-            logger.error(f"Error toggling Bedrock: {e}")
-            return jsonify({'success': False, 'message': str(e)})
-        except Exception as e:
-            logger.error(f"Error toggling Bedrock: {e}")
-            return jsonify({'success': False, 'message': str(e)})
-
-
+            
+            return jsonify({
+                'success': True,
+                'message': 'Bedrock enabled! Switched to DEV environment and updated .zshrc.',
+                'enabled': True
+            })
+        else:
+            # Disable Bedrock
+            # 1. Update shell profile
+            profile_updated = _update_shell_profile(False)
+            
+            # 2. Revert environment
+            revert_to = session.get('prev_env', 'default')
+            env_reverted = _get_manager().switch_environment(revert_to)
+            
+            message = "Bedrock disabled and .zshrc updated."
+            if env_reverted:
+                message += f" Reverted to {revert_to} environment."
+            else:
+                message += " Failed to revert environment."
+            
+            return jsonify({
+                'success': True,
+                'message': message,
+                'enabled': False
+            })
+
+
     @app.route('/api/assume_role', methods=['POST'])
     def api_assume_role():
         """API endpoint to assume an AWS role"""
-        try:
-            data = request.get_json()
-            role_arn = data.get('role_arn')
-            session_name = data.get('session_name', 'temp-session')
-            external_id = data.get('external_id')
-            duration = data.get('duration', 3600)
-            profile_name = data.get('config_name', 'assumed-role')
-            source_profile = data.get('source_profile')  # Allow specifying source profile
+        data, missing = _json('role_arn')
+        role_arn = data.get('role_arn')
+        session_name = data.get('session_name', 'temp-session')
+        external_id = data.get('external_id')
+        duration = data.get('duration', 3600)
+        profile_name = data.get('config_name', 'assumed-role')
+        source_profile = data.get('source_profile')  # Allow specifying source profile
 
-            if not role_arn:
-                return jsonify({'success': False, 'message': 'Role ARN is required'})
+        if missing:
+            return _error('Role ARN is required')
 
-            # Use the role manager to assume the role (don't save to file for web interface)
-            result = aws_manager.assume_role(role_arn, session_name, external_id, duration, profile_name=profile_name, save_to_profile=False, source_profile=source_profile)
+        # Use the role manager to assume the role (don't save to file for web interface)
+        result = _get_manager().assume_role(role_arn, session_name, external_id, duration, profile_name=profile_name, save_to_profile=False, source_profile=source_profile)
 
-            if result.get('success'):
-                # Store credentials in session for cross-tab usage using session manager
-                session_manager.set_assumed_credentials(result.get('credentials'), profile_name)
+        if result.get('success'):
+            # Store credentials in session for cross-tab usage using session manager
+            session_manager.set_assumed_credentials(result.get('credentials'), profile_name)
 
-                return jsonify({
-                    'success': True,
-                    'message': 'Role assumed successfully',
-                    'profile_name': result.get('profile_name'),
-                    'credentials': result.get('credentials'),
-                    'session_active': True
-                })
-            else:
-                return jsonify({
-                    'success': False,
-                    'message': result.get('message', 'Failed to assume role')
-                })
+            return jsonify({
+                'success': True,
+                'message': 'Role assumed successfully',
+                'profile_name': result.get('profile_name'),
+                'credentials': result.get('credentials'),
+                'session_active': True
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': result.get('message', 'Failed to assume role')
+            })
 
-        except Exception as e:
-            logger.error(f"Error assuming role: {e}")
-            return jsonify({'success': False, 'message': str(e)})
-    
     @app.route('/api/assume_role_script', methods=['POST'])
     def api_assume_role_script():
         """API endpoint to generate assume role script"""
-        try:
-            data = request.get_json()
-            config_name = data.get('config_name')
-            
-            if not config_name:
-                return jsonify({'success': False, 'message': 'Configuration name is required'})
-
-            # Get the role config
-            assume_role_configs = aws_manager.config_manager.get_assume_role_configs()
-            if config_name not in assume_role_configs:
-                return jsonify({'success': False, 'message': f'Role configuration "{config_name}" not found'})
-            
-            config = assume_role_configs[config_name]
-            
-            # Generate script at fixed location
-            from pathlib import Path
-            script_path = Path.home() / 'assume-role.sh'
-            
-            script_content = f"""#!/bin/bash
-# Auto-generated AWS Assume Role Script
-# Current Role: {config_name}
-# Description: {config.get('description', 'No description')}
-# Generated: {Path(__file__).stat().st_mtime}
-
-# Clear previously assumed role credentials
-unset AWS_ACCESS_KEY_ID
-unset AWS_SECRET_ACCESS_KEY
-unset AWS_SESSION_TOKEN
-
-echo "🔄 Clearing previous AWS credentials..."
-echo "🔐 Assuming role: {config_name}..."
-
-response=$(aws sts assume-role \\
-  --role-arn {config.get('role_arn')} \\
-  --role-session-name {config.get('session_name')}"""
-            
-            if config.get('external_id'):
-                script_content += f""" \\
-  --external-id {config.get('external_id')}"""
-            
-            script_content += """ 2>&1)
-
-# Check if assume-role was successful
-if [ $? -ne 0 ]; then
-  echo "❌ Failed to assume role"
-  echo "$response"
-  return 1
-fi
-
-# Parse and export credentials using jq
-export AWS_ACCESS_KEY_ID=$(echo "$response" | jq -r '.Credentials.AccessKeyId')
-export AWS_SECRET_ACCESS_KEY=$(echo "$response" | jq -r '.Credentials.SecretAccessKey')
-export AWS_SESSION_TOKEN=$(echo "$response" | jq -r '.Credentials.SessionToken')
+        data, missing = _json('config_name')
+        config_name = data.get('config_name')
+        
+        if missing:
+            return _error('Configuration name is required')
 
-echo "✅ Successfully assumed role: """ + config_name + """\"
-echo "📌 You can now use: aws s3 ls"
-echo "⏰ Credentials will expire in 1 hour"
-"""
-            
-            # Write script
+        # Get the role config
+        assume_role_configs = _get_manager().config_manager.get_assume_role_configs()
+        if config_name not in assume_role_configs:
+            return _error(f'Role configuration "{config_name}" not found')
+        
+        config = assume_role_configs[config_name]
+        
+        # Generate script at fixed location
+        script_path = Path.home() / 'assume-role.sh'
+        external_id = config.get('external_id')
+        script_content = _ASSUME_ROLE_SCRIPT.format(
+            config_name=config_name,
+            description=config.get('description', 'No description'),
+            generated=_SCRIPT_GENERATED,
+            role_arn=config.get('role_arn'),
+            session_name=config.get('session_name'),
+            external_id_arg=f' \\\n  --external-id {external_id}' if external_id else ''
+        )
+        
+        # Skip the write when the script on disk is already current
+        try:
+            unchanged = script_path.read_text() == script_content
+        except OSError:
+            unchanged = False
+        if not unchanged:
             script_path.write_text(script_content)
             script_path.chmod(0o755)
-            
-            logger.info(f"Generated assume role script for {config_name} at {script_path}")
-            
-            return jsonify({
-                'success': True, 
-                'message': f'Script generated for {config_name}',
-                'script_path': str(script_path),
-                'instructions': f'Run: source {script_path}'
-            })
-                
-        except Exception as e:
-            logger.error(f"Error generating script: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        
+        logger.info("Generated assume role script for %s at %s", config_name, script_path)
+        
+        return jsonify({
+            'success': True, 
+            'message': f'Script generated for {config_name}',
+            'script_path': str(script_path),
+            'instructions': f'Run: source {script_path}'
+        })
 
     @app.route('/api/remove_assume_role', methods=['POST'])
     def api_remove_assume_role():
         """API endpoint to remove assumed role credentials"""
-        try:
-            data = request.get_json()
-            profile_name = data.get('profile_name', 'assumed-role')
-
-            # Check if we have session-based credentials (web interface)
-            session_info = session_manager.get_session_info()
-            if session_info.get('session_credentials_active'):
-                # For web interface, just clear session credentials
-                logger.info(f"Removing assumed role: {session_info.get('assumed_role')}")
-                session_manager.clear_assumed_credentials()
-                logger.info("Assumed role credentials removed from session")
-                return jsonify({
-                    'success': True,
-                    'message': 'Assumed role credentials removed successfully',
-                    'profile_name': profile_name
-                })
-
-            # For CLI/file-based credentials, remove from credentials file
-            result = aws_manager.remove_assume_role(profile_name)
+        data, _ = _json()
+        profile_name = data.get('profile_name', 'assumed-role')
+
+        # Check if we have session-based credentials (web interface)
+        session_info = session_manager.get_session_info()
+        if session_info.get('session_credentials_active'):
+            # For web interface, just clear session credentials
+            logger.info("Removing assumed role: %s", session_info.get('assumed_role'))
+            session_manager.clear_assumed_credentials()
+            logger.info("Assumed role credentials removed from session")
+            return jsonify({
+                'success': True,
+                'message': 'Assumed role credentials removed successfully',
+                'profile_name': profile_name
+            })
 
-            if result.get('success'):
-                return jsonify({
-                    'success': True,
-                    'message': 'Assumed role credentials removed successfully',
-                    'profile_name': profile_name
-                })
-            else:
-                return jsonify({
-                    'success': False,
-                    'message': result.get('message', 'Failed to remove assumed role')
-                })
+        # For CLI/file-based credentials, remove from credentials file
+        result = _get_manager().remove_assume_role(profile_name)
 
-        except Exception as e:
-            logger.error(f"Error removing assume role: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        if result.get('success'):
+            return jsonify({
+                'success': True,
+                'message': 'Assumed role credentials removed successfully',
+                'profile_name': profile_name
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': result.get('message', 'Failed to remove assumed role')
+            })
 
     @app.route('/api/add_assume_role_config', methods=['POST'])
     def api_add_assume_role_config():
         """API endpoint to add a new assume role configuration"""
-        try:
-            data = request.get_json()
-            config_name = data.get('config_name')
-            description = data.get('description')
-            role_arn = data.get('role_arn')
-            session_name = data.get('session_name')
-            external_id = data.get('external_id')
-            duration = data.get('duration', 3600)
-
-            if not all([config_name, description, role_arn, session_name]):
-                return jsonify({'success': False, 'message': 'Configuration name, description, role ARN, and session name are required'})
-
-            # Update config
-            config = aws_manager.config_manager.config
-            if 'assume_role_configs' not in config:
-                config['assume_role_configs'] = {}
-            
-            config['assume_role_configs'][config_name] = {
-                'role_arn': role_arn,
-                'session_name': session_name,
-                'external_id': external_id,
-                'duration': duration,
-                'description': description
-            }
-            
-            result = aws_manager.config_manager.save_config()
-            
-            if result:
-                return jsonify({'success': True, 'message': f'Role configuration {config_name} added successfully'})
-            else:
-                return jsonify({'success': False, 'message': f'Failed to save configuration'})
-                
-        except Exception as e:
-            logger.error(f"Error adding assume role config: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        return _put_assume_role_config(update=False)
 
     @app.route('/api/update_assume_role_config', methods=['POST'])
     def api_update_assume_role_config():
         """API endpoint to update an existing assume role configuration"""
-        try:
-            data = request.get_json()
-            config_name = data.get('config_name')
-            description = data.get('description')
-            role_arn = data.get('role_arn')
-            session_name = data.get('session_name')
-            external_id = data.get('external_id')
-            duration = data.get('duration', 3600)
-
-            if not all([config_name, description, role_arn, session_name]):
-                return jsonify({'success': False, 'message': 'Configuration name, description, role ARN, and session name are required'})
-
-            # Update config
-            config = aws_manager.config_manager.config
-            if 'assume_role_configs' not in config:
-                return jsonify({'success': False, 'message': 'No assume role configurations found'})
-            
-            if config_name not in config['assume_role_configs']:
-                return jsonify({'success': False, 'message': f'Configuration {config_name} not found'})
-            
-            config['assume_role_configs'][config_name] = {
-                'role_arn': role_arn,
-                'session_name': session_name,
-                'external_id': external_id,
-                'duration': duration,
-                'description': description
-            }
-            
-            result = aws_manager.config_manager.save_config()
-            
-            if result:
-                return jsonify({'success': True, 'message': f'Role configuration {config_name} updated successfully'})
-            else:
-                return jsonify({'success': False, 'message': f'Failed to save configuration'})
-                
-        except Exception as e:
-            logger.error(f"Error updating assume role config: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        return _put_assume_role_config(update=True)
 
     @app.route('/api/delete_assume_role_config', methods=['POST'])
     def api_delete_assume_role_config():
         """API endpoint to delete an assume role configuration"""
-        try:
-            data = request.get_json()
-            config_name = data.get('config_name')
+        data, missing = _json('config_name')
+        config_name = data.get('config_name')
 
-            if not config_name:
-                return jsonify({'success': False, 'message': 'Configuration name is required'})
+        if missing:
+            return _error('Configuration name is required')
 
-            # Update config
-            config = aws_manager.config_manager.config
-            if 'assume_role_configs' not in config:
-                return jsonify({'success': False, 'message': 'No assume role configurations found'})
-            
-            if config_name not in config['assume_role_configs']:
-                return jsonify({'success': False, 'message': f'Configuration {config_name} not found'})
-            
-            del config['assume_role_configs'][config_name]
-            
-            result = aws_manager.config_manager.save_config()
-            
-            if result:
-                return jsonify({'success': True, 'message': f'Role configuration {config_name} deleted successfully'})
-            else:
-                return jsonify({'success': False, 'message': f'Failed to save configuration'})
-                
-        except Exception as e:
-            logger.error(f"Error deleting assume role config: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        # Update config
+        config = _get_manager().config_manager.config
+        if config_name not in config['assume_role_configs']:
+            return _error(f'Configuration {config_name} not found')
+        
+        result = _mutate_config('assume_role_configs', config_name, None)
+        
+        if result:
+            return _ok(f'Role configuration {config_name} deleted successfully')
+        else:
+            return _SAVE_FAILED
 
     @app.route('/api/download_credentials')
     def api_download_credentials():
         """API endpoint to redirect to JumpCloud for credential download"""
-        from flask import redirect
         return redirect('https://sso.jumpcloud.com/saml2/aws')
 
     @app.route('/api/list_s3_buckets', methods=['GET'])
     def api_list_s3_buckets():
         """API endpoint to list S3 buckets"""
-        try:
-            result = aws_manager.list_s3_buckets()
-            return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error listing S3 buckets: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().list_s3_buckets()
+        return jsonify(result)
 
     @app.route('/api/list_s3_objects', methods=['GET'])
     def api_list_s3_objects():
         """API endpoint to list S3 objects"""
-        try:
-            bucket_name = request.args.get('bucket')
-            prefix = request.args.get('prefix', '')
-            max_keys = int(request.args.get('max_keys', 20))
-            continuation_token = request.args.get('continuation_token')
+        bucket_name = request.args.get('bucket')
+        prefix = request.args.get('prefix', '')
+        max_keys = max(1, min(MAX_LIST_KEYS, request.args.get('max_keys', 20, type=int)))
+        continuation_token = request.args.get('continuation_token')
 
-            if not bucket_name:
-                return jsonify({'success': False, 'message': 'Bucket name is required'})
+        if not bucket_name:
+            return _NEED_BUCKET_NAME
 
-            result = aws_manager.list_s3_objects(bucket_name, prefix, max_keys, continuation_token)
-            return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error listing S3 objects: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().list_s3_objects(bucket_name, prefix, max_keys, continuation_token)
+        return jsonify(result)
 
-    @app.route('/api/download_s3_object', methods=['POST'])
+    @app.route('/api/download_s3_object', methods=['GET', 'POST'])
     def api_download_s3_object():
-        """API endpoint to download S3 object"""
-        try:
-            data = request.get_json()
-            bucket_name = data.get('bucket')
-            object_key = data.get('object_key')
-            local_path = data.get('local_path')
-
-            if not bucket_name or not object_key:
-                return jsonify({'success': False, 'message': 'Bucket name and object key are required'})
-
-            result = aws_manager.download_s3_file(bucket_name, object_key, local_path)
+        """API endpoint to download S3 object, to local_path on this machine or straight from S3"""
+        if request.method == 'GET':
+            data = request.args
+            missing = not (data.get('bucket') and data.get('object_key'))
+        else:
+            data, missing = _json('bucket', 'object_key')
+        bucket_name = data.get('bucket')
+        object_key = data.get('object_key')
+        local_path = data.get('local_path')
+
+        if missing:
+            return _NEED_BUCKET_AND_KEY
+
+        if not local_path:
+            # Nowhere to save it here, so send the client to S3 rather than relaying the bytes
+            result = _get_manager().get_s3_presigned_download_url(bucket_name, object_key,
+                                                                  PRESIGNED_DOWNLOAD_EXPIRATION)
+            if result['success']:
+                return redirect(result['presigned_url'], code=302)
             return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error downloading S3 object: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+
+        result = _get_manager().download_s3_file(bucket_name, object_key, local_path)
+        return jsonify(result)
 
     @app.route('/api/upload_s3_object', methods=['POST'])
     def api_upload_s3_object():
         """API endpoint to upload S3 object"""
-        try:
-            # Handle file upload from form data
-            if 'file' in request.files:
-                file = request.files['file']
-                bucket_name = request.form.get('bucket')
-                prefix = request.form.get('prefix', '')
-                
-                if not file or not bucket_name:
-                    return jsonify({'success': False, 'message': 'File and bucket name are required'})
-                
-                if file.filename == '':
-                    return jsonify({'success': False, 'message': 'No selected file'})
-                
-                # Save to temporary file
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False) as temp:
-                    file.save(temp.name)
-                    temp_path = temp.name
-                
-                try:
-                    object_key = f"{prefix}{file.filename}" if prefix else file.filename
-                    # Remove leading slash if present in prefix to avoid double slashes or absolute path issues
-                    if object_key.startswith('/'):
-                        object_key = object_key[1:]
-                        
-                    result = aws_manager.upload_s3_file(temp_path, bucket_name, object_key)
-                    return jsonify(result)
-                finally:
-                    # Clean up temp file
-                    if os.path.exists(temp_path):
-                        os.unlink(temp_path)
+        # Handle file upload from form data
+        if 'file' in request.files:
+            file = request.files['file']
+            bucket_name = request.form.get('bucket')
+            prefix = request.form.get('prefix', '')
             
-            # Handle local path upload (if needed in future, but above is for web upload)
-            else:
-                return jsonify({'success': False, 'message': 'No file part in the request'})
-                
-        except Exception as e:
-            logger.error(f"Error uploading S3 object: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+            if not file or not bucket_name:
+                return _error('File and bucket name are required')
+            
+            if file.filename == '':
+                return _error('No selected file')
+            
+            # Save to temporary file
+            with tempfile.NamedTemporaryFile(delete=False) as temp:
+                file.save(temp.name)
+                temp_path = temp.name
+            
+            try:
+                object_key = f"{prefix}{file.filename}" if prefix else file.filename
+                # Remove leading slash if present in prefix to avoid double slashes or absolute path issues
+                if object_key.startswith('/'):
+                    object_key = object_key[1:]
+                    
+                result = _get_manager().upload_s3_file(temp_path, bucket_name, object_key)
+                return jsonify(result)
+            finally:
+                # Clean up temp file
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+        
+        # Handle local path upload (if needed in future, but above is for web upload)
+        else:
+            return _error('No file part in the request')
 
     @app.route('/api/delete_s3_object', methods=['POST'])
     def api_delete_s3_object():
         """API endpoint to delete S3 object"""
-        try:
-            data = request.get_json()
-            bucket_name = data.get('bucket')
-            object_key = data.get('object_key')
+        data, missing = _json('bucket', 'object_key')
+        bucket_name = data.get('bucket')
+        object_key = data.get('object_key')
 
-            if not bucket_name or not object_key:
-                return jsonify({'success': False, 'message': 'Bucket name and object key are required'})
+        if missing:
+            return _NEED_BUCKET_AND_KEY
 
-            result = aws_manager.delete_s3_object(bucket_name, object_key)
-            return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error deleting S3 object: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().delete_s3_object(bucket_name, object_key)
+        return jsonify(result)
 
     @app.route('/api/search_s3_object', methods=['GET'])
     def api_search_s3_object():
         """API endpoint to search for S3 object by complete path"""
-        try:
-            bucket_name = request.args.get('bucket')
-            object_key = request.args.get('key')
+        bucket_name = request.args.get('bucket')
+        object_key = request.args.get('key')
 
-            if not bucket_name or not object_key:
-                return jsonify({'success': False, 'message': 'Bucket name and object key are required'})
+        if not bucket_name or not object_key:
+            return _NEED_BUCKET_AND_KEY
 
-            result = aws_manager.search_s3_object_by_path(bucket_name, object_key)
-            return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error searching S3 object: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().search_s3_object_by_path(bucket_name, object_key)
+        return jsonify(result)
 
     @app.route('/api/get_s3_download_url', methods=['GET'])
     def api_get_s3_download_url():
         """API endpoint to get presigned download URL for S3 object"""
-        try:
-            bucket_name = request.args.get('bucket')
-            object_key = request.args.get('key')
-            expiration = int(request.args.get('expiration', 3600))
+        bucket_name = request.args.get('bucket')
+        object_key = request.args.get('key')
+        expiration = int(request.args.get('expiration', 3600))
 
-            if not bucket_name or not object_key:
-                return jsonify({'success': False, 'message': 'Bucket name and object key are required'})
+        if not bucket_name or not object_key:
+            return _NEED_BUCKET_AND_KEY
 
-            result = aws_manager.get_s3_presigned_download_url(bucket_name, object_key, expiration)
-            return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error getting S3 download URL: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().get_s3_presigned_download_url(bucket_name, object_key, expiration)
+        return jsonify(result)
 
     @app.route('/api/get_s3_credential_info', methods=['GET'])
     def api_get_s3_credential_info():
         """API endpoint to get current S3 credential information"""
-        try:
-            result = aws_manager.get_s3_credential_info()
-            return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error getting S3 credential info: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().get_s3_credential_info()
+        return jsonify(result)
 
     @app.route('/api/list_available_profiles', methods=['GET'])
     def api_list_available_profiles():
         """API endpoint to list available AWS profiles and their account information"""
-        try:
-            result = aws_manager.list_available_profiles()
-            return jsonify({'success': True, 'profiles': result})
-        except Exception as e:
-            logger.error(f"Error listing available profiles: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().list_available_profiles()
+        return jsonify({'success': True, 'profiles': result})
 
     @app.route('/api/get_predefined_buckets', methods=['GET'])
     def api_get_predefined_buckets():
         """API endpoint to get predefined buckets from config"""
-        try:
-            predefined_buckets = aws_manager.config_manager.get_predefined_buckets()
-            return jsonify({'success': True, 'buckets': predefined_buckets})
-        except Exception as e:
-            logger.error(f"Error getting predefined buckets: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        predefined_buckets = _get_manager().config_manager.get_predefined_buckets()
+        return jsonify({'success': True, 'buckets': predefined_buckets})
 
     @app.route('/api/add_custom_bucket', methods=['POST'])
     def api_add_custom_bucket():
         """API endpoint to add a custom bucket"""
-        try:
-            data = request.get_json()
-            bucket_name = data.get('bucket_name')
-
-            if not bucket_name:
-                return jsonify({'success': False, 'message': 'Bucket name is required'})
-
-            # Add to config
-            config = aws_manager.config_manager.config
-            if 'custom_buckets' not in config:
-                config['custom_buckets'] = []
-
-            if bucket_name not in config['custom_buckets']:
-                config['custom_buckets'].append(bucket_name)
-                aws_manager.config_manager.save_config()
-                return jsonify({'success': True, 'message': f'Bucket {bucket_name} added successfully'})
-            else:
-                return jsonify({'success': False, 'message': f'Bucket {bucket_name} already exists'})
-
-        except Exception as e:
-            logger.error(f"Error adding custom bucket: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        return _change_bucket_list('custom_buckets', True,
+                                   'Bucket {} added successfully', 'Bucket {} already exists')
 
     @app.route('/api/delete_custom_bucket', methods=['POST'])
     def api_delete_custom_bucket():
         """API endpoint to delete a custom bucket"""
-        try:
-            data = request.get_json()
-            bucket_name = data.get('bucket_name')
-
-            if not bucket_name:
-                return jsonify({'success': False, 'message': 'Bucket name is required'})
-
-            # Remove from config
-            config = aws_manager.config_manager.config
-            if 'custom_buckets' in config and bucket_name in config['custom_buckets']:
-                config['custom_buckets'].remove(bucket_name)
-                aws_manager.config_manager.save_config()
-                return jsonify({'success': True, 'message': f'Bucket {bucket_name} removed successfully'})
-            else:
-                return jsonify({'success': False, 'message': f'Bucket {bucket_name} not found'})
-
-        except Exception as e:
-            logger.error(f"Error deleting custom bucket: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        return _change_bucket_list('custom_buckets', False,
+                                   'Bucket {} removed successfully', 'Bucket {} not found')
 
     @app.route('/api/list_custom_buckets', methods=['GET'])
     def api_list_custom_buckets():
         """API endpoint to list custom buckets"""
-        try:
-            config = aws_manager.config_manager.config
-            custom_buckets = config.get('custom_buckets', [])
-            return jsonify({'success': True, 'buckets': custom_buckets})
-        except Exception as e:
-            logger.error(f"Error listing custom buckets: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        config = _get_manager().config_manager.config
+        custom_buckets = config['custom_buckets']
+        return jsonify({'success': True, 'buckets': custom_buckets})
 
     @app.route('/api/add_predefined_bucket', methods=['POST'])
     def api_add_predefined_bucket():
         """API endpoint to add a predefined bucket"""
-        try:
-            data = request.get_json()
-            bucket_name = data.get('bucket_name')
-
-            if not bucket_name:
-                return jsonify({'success': False, 'message': 'Bucket name is required'})
-
-            config = aws_manager.config_manager.config
-            if 'predefined_buckets' not in config:
-                config['predefined_buckets'] = []
-
-            if bucket_name not in config['predefined_buckets']:
-                config['predefined_buckets'].append(bucket_name)
-                aws_manager.config_manager.save_config()
-                return jsonify({'success': True, 'message': f'Bucket {bucket_name} added to predefined list'})
-            else:
-                return jsonify({'success': False, 'message': f'Bucket {bucket_name} already exists in predefined list'})
-
-        except Exception as e:
-            logger.error(f"Error adding predefined bucket: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        return _change_bucket_list('predefined_buckets', True,
+                                   'Bucket {} added to predefined list',
+                                   'Bucket {} already exists in predefined list')
 
     @app.route('/api/update_predefined_bucket', methods=['POST'])
     def api_update_predefined_bucket():
         """API endpoint to update a predefined bucket"""
-        try:
-            data = request.get_json()
-            old_bucket_name = data.get('old_bucket_name')
-            new_bucket_name = data.get('new_bucket_name')
-
-            if not old_bucket_name or not new_bucket_name:
-                return jsonify({'success': False, 'message': 'Both old and new bucket names are required'})
-
-            config = aws_manager.config_manager.config
-            if 'predefined_buckets' in config and old_bucket_name in config['predefined_buckets']:
-                index = config['predefined_buckets'].index(old_bucket_name)
-                config['predefined_buckets'][index] = new_bucket_name
-                aws_manager.config_manager.save_config()
-                return jsonify({'success': True, 'message': f'Bucket updated from {old_bucket_name} to {new_bucket_name}'})
-            else:
-                return jsonify({'success': False, 'message': f'Bucket {old_bucket_name} not found in predefined list'})
-
-        except Exception as e:
-            logger.error(f"Error updating predefined bucket: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('old_bucket_name', 'new_bucket_name')
+        old_bucket_name = data.get('old_bucket_name')
+        new_bucket_name = data.get('new_bucket_name')
+
+        if missing:
+            return _error('Both old and new bucket names are required')
+
+        config_manager = _get_manager().config_manager
+        buckets = config_manager.config['predefined_buckets']
+        if old_bucket_name in buckets:
+            buckets[buckets.index(old_bucket_name)] = new_bucket_name
+            if not config_manager.save_config():
+                return _SAVE_FAILED
+            return _ok(f'Bucket updated from {old_bucket_name} to {new_bucket_name}')
+        else:
+            return _error(f'Bucket {old_bucket_name} not found in predefined list')
 
     @app.route('/api/delete_predefined_bucket', methods=['POST'])
     def api_delete_predefined_bucket():
         """API endpoint to delete a predefined bucket"""
-        try:
-            data = request.get_json()
-            bucket_name = data.get('bucket_name')
-
-            if not bucket_name:
-                return jsonify({'success': False, 'message': 'Bucket name is required'})
-
-            config = aws_manager.config_manager.config
-            if 'predefined_buckets' in config and bucket_name in config['predefined_buckets']:
-                config['predefined_buckets'].remove(bucket_name)
-                aws_manager.config_manager.save_config()
-                return jsonify({'success': True, 'message': f'Bucket {bucket_name} removed from predefined list'})
-            else:
-                return jsonify({'success': False, 'message': f'Bucket {bucket_name} not found in predefined list'})
-
-        except Exception as e:
-            logger.error(f"Error deleting predefined bucket: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        return _change_bucket_list('predefined_buckets', False,
+                                   'Bucket {} removed from predefined list',
+                                   'Bucket {} not found in predefined list')
 
     @app.route('/api/check_s3_bucket_access', methods=['GET'])
     def api_check_s3_bucket_access():
         """API endpoint to check if an S3 bucket is accessible"""
-        try:
-            bucket_name = request.args.get('bucket')
-            if not bucket_name:
-                return jsonify({'success': False, 'message': 'Bucket name is required'})
+        bucket_name = request.args.get('bucket')
+        if not bucket_name:
+            return _NEED_BUCKET_NAME
 
-            result = aws_manager.check_s3_bucket_access(bucket_name)
-            return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error checking bucket access: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().check_s3_bucket_access(bucket_name)
+        return jsonify(result)
 
     # EFS API Endpoints
     @app.route('/api/efs/config', methods=['GET', 'POST', 'PUT', 'DELETE'])
     def api_efs_config():
         """API endpoint to manage EFS connections"""
-        try:
-            if request.method == 'GET':
-                connections = aws_manager.get_efs_connections()
-                return jsonify({'success': True, 'connections': connections})
-            elif request.method == 'POST':
-                data = request.get_json()
-                host = data.get('host')
-                username = data.get('username')
-                key_path = data.get('key_path', '')
-                name = data.get('name', '')
+        if request.method == 'GET':
+            connections = _get_manager().get_efs_connections()
+            return jsonify({'success': True, 'connections': connections})
+        elif request.method == 'POST':
+            data, missing = _json('host', 'username')
+            host = data.get('host')
+            username = data.get('username')
+            key_path = data.get('key_path', '')
+            name = data.get('name', '')
+            
+            if missing:
+                return _error('Host and username are required')
                 
-                if not all([host, username]):
-                    return jsonify({'success': False, 'message': 'Host and username are required'})
-                    
-                result = aws_manager.add_efs_connection(host, username, key_path, name)
-                return jsonify({'success': result, 'message': 'EFS connection saved'})
-            elif request.method == 'PUT':
-                data = request.get_json()
-                index = data.get('index')
-                host = data.get('host')
-                username = data.get('username')
-                key_path = data.get('key_path', '')
-                name = data.get('name', '')
+            result = _get_manager().add_efs_connection(host, username, key_path, name)
+            return jsonify({'success': result, 'message': 'EFS connection saved'})
+        elif request.method == 'PUT':
+            data, missing = _json('host', 'username')
+            index = data.get('index')
+            host = data.get('host')
+            username = data.get('username')
+            key_path = data.get('key_path', '')
+            name = data.get('name', '')
+            
+            if index is None or missing:
+                return _error('Index, host, and username are required')
                 
-                if index is None or not all([host, username]):
-                    return jsonify({'success': False, 'message': 'Index, host, and username are required'})
-                    
-                result = aws_manager.update_efs_connection(index, host, username, key_path, name)
-                return jsonify({'success': result, 'message': 'EFS connection updated'})
-            elif request.method == 'DELETE':
-                data = request.get_json()
-                index = data.get('index')
-                if index is None:
-                    return jsonify({'success': False, 'message': 'Index is required'})
-                result = aws_manager.remove_efs_connection(index)
-                return jsonify({'success': result, 'message': 'Connection removed'})
-        except Exception as e:
-            logger.error(f"Error handling EFS config: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+            result = _get_manager().update_efs_connection(index, host, username, key_path, name)
+            return jsonify({'success': result, 'message': 'EFS connection updated'})
+        elif request.method == 'DELETE':
+            data, _ = _json()
+            index = data.get('index')
+            if index is None:
+                return _error('Index is required')
+            result = _get_manager().remove_efs_connection(index)
+            return jsonify({'success': result, 'message': 'Connection removed'})
 
     @app.route('/api/efs/list', methods=['GET', 'POST'])
     def api_efs_list():
         """API endpoint to list EFS files or search them"""
-        try:
-            if request.method == 'GET':
-                path = request.args.get('path', '.')
-                conn_id = int(request.args.get('connection_id', 0))
-                result = aws_manager.list_efs_files(path, conn_id)
+        if request.method == 'GET':
+            path = request.args.get('path', '.')
+            conn_id = int(request.args.get('connection_id', 0))
+            result = _get_manager().list_efs_files(path, conn_id)
+        else:
+            data, _ = _json()
+            path = data.get('path', '.')
+            search_term = data.get('search_term')
+            conn_id = int(data.get('connection_id', 0))
+            
+            if search_term:
+                result = _get_manager().search_efs_files(search_term, path, conn_id)
             else:
-                data = request.get_json() or {}
-                path = data.get('path', '.')
-                search_term = data.get('search_term')
-                conn_id = int(data.get('connection_id', 0))
-                
-                if search_term:
-                    result = aws_manager.search_efs_files(search_term, path, conn_id)
-                else:
-                    result = aws_manager.list_efs_files(path, conn_id)
-            return jsonify(result)
-        except Exception as e:
-             logger.error(f"Error handling EFS file list/search: {e}")
-             return jsonify({'success': False, 'message': str(e)})
+                result = _get_manager().list_efs_files(path, conn_id)
+        return jsonify(result)
 
     @app.route('/api/efs/download', methods=['POST', 'GET'])
     def api_efs_download():
         """API endpoint to download EFS file (or folder) directly to browser"""
-        try:
-            if request.method == 'GET':
-                remote_path = request.args.get('remote_path')
-                is_folder = request.args.get('is_folder') == 'true'
-                conn_id = int(request.args.get('connection_id', 0))
-            else:
-                data = request.get_json() or {}
-                remote_path = data.get('remote_path')
-                is_folder = data.get('is_folder') == 'true'
-                conn_id = int(data.get('connection_id', 0))
+        if request.method == 'GET':
+            data = request.args
+        else:
+            data, _ = _json()
+        remote_path = data.get('remote_path')
+        is_folder = data.get('is_folder') == 'true'
+        conn_id = int(data.get('connection_id', 0))
+        
+        if not remote_path:
+            return _NEED_REMOTE_PATH
             
-            if not remote_path:
-                return jsonify({'success': False, 'message': 'Remote path is required'})
-                
-            if is_folder:
-                result = aws_manager.download_efs_folder(remote_path, conn_id)
-            else:
-                result = aws_manager.download_efs_file(remote_path, None, conn_id)
-                
-            if result.get('success') and 'local_path' in result:
-                from flask import send_file
-                local_path = result['local_path']
-                response = send_file(local_path, as_attachment=True, download_name=os.path.basename(local_path))
-                
-                # Cleanup after send
-                @response.call_on_close
-                def cleanup():
-                    try:
-                        if os.path.exists(local_path):
-                            os.remove(local_path)
-                    except Exception as e:
-                        logger.error(f"Error cleaning up temp file {local_path}: {e}")
-                
-                return response
+        if is_folder:
+            result = _get_manager().download_efs_folder(remote_path, conn_id)
+        else:
+            result = _get_manager().download_efs_file(remote_path, None, conn_id)
             
-            return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error downloading EFS item: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        if result.get('success') and 'local_path' in result:
+            local_path = result['local_path']
+            response = send_file(local_path, as_attachment=True, download_name=os.path.basename(local_path))
+            
+            # Cleanup after send
+            @response.call_on_close
+            def cleanup():
+                try:
+                    if os.path.exists(local_path):
+                        os.remove(local_path)
+                except Exception as e:
+                    logger.error("Error cleaning up temp file %s: %s", local_path, e)
+            
+            return response
+        
+        return jsonify(result)
 
     @app.route('/api/efs/upload', methods=['POST'])
     def api_efs_upload():
         """API endpoint to upload EFS file"""
-        try:
-             # Handle file upload from form data
-            if 'file' in request.files:
-                file = request.files['file']
-                remote_dir = request.form.get('remote_dir', '.')
+        # Handle file upload from form data
+        if 'file' in request.files:
+            file = request.files['file']
+            remote_dir = request.form.get('remote_dir', '.')
+            
+            if not file:
+                return _error('File is required')
+            
+            # Save to temporary file
+            with tempfile.NamedTemporaryFile(delete=False) as temp:
+                file.save(temp.name)
+                temp_path = temp.name
+            
+            try:
+                # Rename temp file to original filename to ensure correct upload name
+                # Or pass original filename to manager if supported. 
+                # Here we rely on EFSManager uploading the file at temp_path.
+                # Wait, EFSManager.upload_file takes local_path and uploads it with os.path.basename(local_path).
+                # So we need to rename the temp file to the original filename.
                 
-                if not file:
-                    return jsonify({'success': False, 'message': 'File is required'})
+                # Create a directory for the temp file with the correct name
+                temp_dir = tempfile.mkdtemp()
+                temp_file_path = os.path.join(temp_dir, file.filename)
+                if os.path.exists(temp_path):
+                    os.rename(temp_path, temp_file_path)
                 
-                # Save to temporary file
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False) as temp:
-                    file.save(temp.name)
-                    temp_path = temp.name
+                conn_id = int(request.form.get('connection_id', 0))
+                result = _get_manager().upload_efs_file(temp_file_path, remote_dir, conn_id)
                 
-                try:
-                    # Rename temp file to original filename to ensure correct upload name
-                    # Or pass original filename to manager if supported. 
-                    # Here we rely on EFSManager uploading the file at temp_path.
-                    # Wait, EFSManager.upload_file takes local_path and uploads it with os.path.basename(local_path).
-                    # So we need to rename the temp file to the original filename.
-                    
-                    # Create a directory for the temp file with the correct name
-                    temp_dir = tempfile.mkdtemp()
-                    temp_file_path = os.path.join(temp_dir, file.filename)
-                    if os.path.exists(temp_path):
-                        os.rename(temp_path, temp_file_path)
-                    
-                    conn_id = int(request.form.get('connection_id', 0))
-                    result = aws_manager.upload_efs_file(temp_file_path, remote_dir, conn_id)
-                    
-                    # Clean up
-                    if os.path.exists(temp_file_path):
-                        os.unlink(temp_file_path)
-                    os.rmdir(temp_dir)
-                    
-                    return jsonify(result)
-                    
-                except Exception as e:
-                     if os.path.exists(temp_path):
-                        os.unlink(temp_path)
-                     logger.error(f"Error during EFS upload: {e}")
-                     return jsonify({'success': False, 'message': str(e)})
-
-            else:
-                 return jsonify({'success': False, 'message': 'No file segment found'})
+                # Clean up
+                if os.path.exists(temp_file_path):
+                    os.unlink(temp_file_path)
+                os.rmdir(temp_dir)
+                
+                return jsonify(result)
+                
+            except Exception as e:
+                 if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                 logger.error("Error during EFS upload: %s", e)
+                 return _error(str(e))
 
-        except Exception as e:
-            logger.error(f"Error in EFS upload API: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        else:
+            return _error('No file segment found')
 
     @app.route('/api/efs/delete', methods=['POST'])
     def api_efs_delete():
         """API endpoint to delete EFS file or folder"""
-        try:
-            data = request.get_json()
-            remote_path = data.get('remote_path')
-            conn_id = int(data.get('connection_id', 0))
+        data, missing = _json('remote_path')
+        remote_path = data.get('remote_path')
+        conn_id = int(data.get('connection_id', 0))
+        
+        if missing:
+            return _NEED_REMOTE_PATH
             
-            if not remote_path:
-                return jsonify({'success': False, 'message': 'Remote path is required'})
-                
-            result = aws_manager.delete_efs_file(remote_path, conn_id)
-            return jsonify(result)
-        except Exception as e:
-            logger.error(f"Error deleting EFS file: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().delete_efs_file(remote_path, conn_id)
+        return jsonify(result)
 
     @app.route('/api/efs/mongo_lookup', methods=['POST'])
     def api_efs_mongo_lookup():
         """Lookup SFTP path from Mongo document"""
-        try:
-            data = request.get_json()
-            env_name = data.get('env_name')
-            search_value = data.get('search_value')
-            
-            if not env_name or not search_value:
-                return jsonify({'success': False, 'message': 'Environment and Search Value are required'})
-            
-            # Fetch Mongo config
-            configs = aws_manager.config_manager.get_mongo_configs()
-            config = next((c for c in configs if c['name'] == env_name), None)
-            
-            if not config:
-                return jsonify({'success': False, 'message': f'Mongo environment "{env_name}" not found'})
-            
-            # Connect to Mongo
-            manager = MongoManager(config['connect_string'], config)
-            db = manager.client['titanDB']
-            # User specifically mentioned "document collection" -- assuming collection name is 'document'
-            collection = db['document']
-            
-            # Build query
-            query = {"$or": [{"requestId": search_value}]}
-            
-            # Try searching by _id (string and ObjectId if possible)
-            query["$or"].append({"_id": search_value})
-            if ObjectId:
-                try:
-                    query["$or"].append({"_id": ObjectId(search_value)})
-                except:
-                    pass
-            
-            doc = collection.find_one(query, {"baseDirectory": 1})
-            manager.close()
-            
-            if not doc:
-                return jsonify({'success': False, 'message': 'No document found matching this ID'})
-            
-            base_dir = doc.get('baseDirectory')
-            if not base_dir:
-                return jsonify({'success': False, 'message': 'Document found, but "baseDirectory" field is missing'})
-            
-            # Transform path: replace /var/data/efs/ with /common/
-            transformed_path = base_dir.replace('/var/data/efs/', '/common/')
-            
-            return jsonify({
-                'success': True, 
-                'path': transformed_path,
-                'original_path': base_dir
-            })
-            
-        except Exception as e:
-            logger.error(f"Error in mongo_lookup: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('env_name', 'search_value')
+        env_name = data.get('env_name')
+        search_value = data.get('search_value')
+        
+        if missing:
+            return _error('Environment and Search Value are required')
+        
+        # Fetch Mongo config
+        configs = _get_manager().config_manager.get_mongo_configs()
+        config = next((c for c in configs if c['name'] == env_name), None)
+        
+        if not config:
+            return _error(f'Mongo environment "{env_name}" not found')
+        
+        # Connect to Mongo
+        manager = MongoManager(config['connect_string'], config)
+        db = manager.client['titanDB']
+        # User specifically mentioned "document collection" -- assuming collection name is 'document'
+        collection = db['document']
+        
+        # Build query
+        query = {"$or": [{"requestId": search_value}]}
+        
+        # Try searching by _id (string and ObjectId if possible)
+        query["$or"].append({"_id": search_value})
+        if ObjectId:
+            try:
+                query["$or"].append({"_id": ObjectId(search_value)})
+            except:
+                pass
+        
+        doc = collection.find_one(query, {"baseDirectory": 1})
+        manager.close()
+        
+        if not doc:
+            return _error('No document found matching this ID')
+        
+        base_dir = doc.get('baseDirectory')
+        if not base_dir:
+            return _error('Document found, but "baseDirectory" field is missing')
+        
+        # Transform path: replace /var/data/efs/ with /common/
+        transformed_path = base_dir.replace('/var/data/efs/', '/common/')
+        
+        return jsonify({
+            'success': True, 
+            'path': transformed_path,
+            'original_path': base_dir
+        })
 
     # MongoDB API Endpoints
     @app.route('/api/mongo/configs', methods=['GET'])
     def api_mongo_get_configs():
-        try:
-            configs = aws_manager.config_manager.get_mongo_configs()
-            return jsonify({'success': True, 'configs': configs})
-        except Exception as e:
-            return jsonify({'success': False, 'message': str(e)})
+        configs = _get_manager().config_manager.get_mongo_configs()
+        return jsonify({'success': True, 'configs': configs})
 
     @app.route('/api/mongo/configs', methods=['POST'])
     def api_mongo_save_config():
-        try:
-            data = request.get_json()
-            name = data.get('name')
-            connect_string = data.get('connect_string')
-            username = data.get('username', '')
-            password = data.get('password', '')
-            default_database = data.get('default_database', '')
-            
-            if not name or not connect_string:
-                return jsonify({'success': False, 'message': 'Name and connection string are required'})
-            
-            result = aws_manager.config_manager.add_mongo_config(name, connect_string, username, password, default_database)
-            return jsonify({'success': result, 'message': 'Config saved' if result else 'Failed to save config'})
-        except Exception as e:
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('name', 'connect_string')
+        name = data.get('name')
+        connect_string = data.get('connect_string')
+        username = data.get('username', '')
+        password = data.get('password', '')
+        default_database = data.get('default_database', '')
+        
+        if missing:
+            return _error('Name and connection string are required')
+        
+        result = _get_manager().config_manager.add_mongo_config(name, connect_string, username, password, default_database)
+        return jsonify({'success': result, 'message': 'Config saved' if result else 'Failed to save config'})
 
     @app.route('/api/mongo/configs/<name>', methods=['DELETE'])
     def api_mongo_delete_config(name):
-        try:
-            result = aws_manager.config_manager.remove_mongo_config(name)
-            return jsonify({'success': result, 'message': 'Config removed' if result else 'Failed to remove config'})
-        except Exception as e:
-            return jsonify({'success': False, 'message': str(e)})
+        result = _get_manager().config_manager.remove_mongo_config(name)
+        return jsonify({'success': result, 'message': 'Config removed' if result else 'Failed to remove config'})
 
     @app.route('/api/mongo/databases', methods=['GET'])
     def api_mongo_get_databases():
-        try:
-            name = request.args.get('env_name')
-            configs = aws_manager.config_manager.get_mongo_configs()
-            config = next((c for c in configs if c['name'] == name), None)
-            
-            if not config:
-                return jsonify({'success': False, 'message': 'Environment not found'})
-            
-            manager = MongoManager(config['connect_string'], config)
-            dbs = manager.get_databases()
-            
-            # Combine with manual databases
-            manual_dbs = config.get('manual_databases', [])
-            all_dbs = list(set(dbs + manual_dbs))
-            
-            manager.close()
-            return jsonify({'success': True, 'databases': all_dbs, 'manual_databases': manual_dbs})
-        except Exception as e:
-            return jsonify({'success': False, 'message': str(e)})
+        name = request.args.get('env_name')
+        configs = _get_manager().config_manager.get_mongo_configs()
+        config = next((c for c in configs if c['name'] == name), None)
+        
+        if not config:
+            return _ENV_NOT_FOUND
+        
+        manager = MongoManager(config['connect_string'], config)
+        dbs = manager.get_databases()
+        
+        # Combine with manual databases
+        manual_dbs = config.get('manual_databases', [])
+        all_dbs = list(set(dbs + manual_dbs))
+        
+        manager.close()
+        return jsonify({'success': True, 'databases': all_dbs, 'manual_databases': manual_dbs})
 
     @app.route('/api/mongo/databases', methods=['POST'])
     def api_mongo_add_database():
-        try:
-            data = request.get_json()
-            env_name = data.get('env_name')
-            db_name = data.get('db_name')
-            
-            if not env_name or not db_name:
-                return jsonify({'success': False, 'message': 'Env name and DB name are required'})
-            
-            result = aws_manager.config_manager.add_manual_database(env_name, db_name)
-            return jsonify({'success': result, 'message': 'Database added' if result else 'Failed to add database'})
-        except Exception as e:
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('env_name', 'db_name')
+        env_name = data.get('env_name')
+        db_name = data.get('db_name')
+        
+        if missing:
+            return _error('Env name and DB name are required')
+        
+        result = _get_manager().config_manager.add_manual_database(env_name, db_name)
+        return jsonify({'success': result, 'message': 'Database added' if result else 'Failed to add database'})
 
     @app.route('/api/mongo/databases/manual', methods=['DELETE'])
     def api_mongo_remove_manual_database():
-        try:
-            data = request.get_json()
-            env_name = data.get('env_name')
-            db_name = data.get('db_name')
-            
-            result = aws_manager.config_manager.remove_manual_database(env_name, db_name)
-            return jsonify({'success': result, 'message': 'Database removed' if result else 'Failed to remove database'})
-        except Exception as e:
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('env_name', 'db_name')
+        env_name = data.get('env_name')
+        db_name = data.get('db_name')
+        
+        if missing:
+            return _error('Env name and DB name are required')
+        
+        result = _get_manager().config_manager.remove_manual_database(env_name, db_name)
+        return jsonify({'success': result, 'message': 'Database removed' if result else 'Failed to remove database'})
 
     @app.route('/api/mongo/collections', methods=['GET'])
     def api_mongo_get_collections():
-        try:
-            name = request.args.get('env_name')
-            db_name = request.args.get('db_name')
-            configs = aws_manager.config_manager.get_mongo_configs()
-            config = next((c for c in configs if c['name'] == name), None)
-            
-            if not config:
-                return jsonify({'success': False, 'message': 'Environment not found'})
-            
-            manager = MongoManager(config['connect_string'], config)
-            cols = manager.get_collections(db_name)
-            
-            # Combine with manual collections
-            manual_cols = config.get('manual_collections', [])
-            all_cols = list(set(cols + manual_cols))
-            
-            manager.close()
-            return jsonify({'success': True, 'collections': all_cols, 'manual_collections': manual_cols})
-        except Exception as e:
-            return jsonify({'success': False, 'message': str(e)})
+        name = request.args.get('env_name')
+        db_name = request.args.get('db_name')
+        configs = _get_manager().config_manager.get_mongo_configs()
+        config = next((c for c in configs if c['name'] == name), None)
+        
+        if not config:
+            return _ENV_NOT_FOUND
+        
+        manager = MongoManager(config['connect_string'], config)
+        cols = manager.get_collections(db_name)
+        
+        # Combine with manual collections
+        manual_cols = config.get('manual_collections', [])
+        all_cols = list(set(cols + manual_cols))
+        
+        manager.close()
+        return jsonify({'success': True, 'collections': all_cols, 'manual_collections': manual_cols})
 
     @app.route('/api/mongo/collections', methods=['POST'])
     def api_mongo_add_collection():
-        try:
-            data = request.get_json()
-            env_name = data.get('env_name')
-            collection_name = data.get('collection_name')
-            
-            if not env_name or not collection_name:
-                return jsonify({'success': False, 'message': 'Env name and collection name are required'})
-            
-            result = aws_manager.config_manager.add_manual_collection(env_name, collection_name)
-            return jsonify({'success': result, 'message': 'Collection added' if result else 'Failed to add collection'})
-        except Exception as e:
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('env_name', 'collection_name')
+        env_name = data.get('env_name')
+        collection_name = data.get('collection_name')
+        
+        if missing:
+            return _error('Env name and collection name are required')
+        
+        result = _get_manager().config_manager.add_manual_collection(env_name, collection_name)
+        return jsonify({'success': result, 'message': 'Collection added' if result else 'Failed to add collection'})
 
     @app.route('/api/mongo/query', methods=['POST'])
     def api_mongo_query():
-        try:
-            data = request.get_json()
-            env_name = data.get('env_name')
-            db_name = data.get('db_name')
-            collection_name = data.get('collection_name')
-            query_str = data.get('query', '{}')
-            projection_str = data.get('projection', '{}')
-            sort_str = data.get('sort', '{}')
-            limit = int(data.get('limit', 100))
-            skip = int(data.get('skip', 0))
-            is_encrypted = data.get('is_encrypted', False)
-            
-            action = data.get('action', 'query')
-            export_path = data.get('export_path', '')
-            
-            configs = aws_manager.config_manager.get_mongo_configs()
-            config = next((c for c in configs if c['name'] == env_name), None)
-            
-            if not config:
-                return jsonify({'success': False, 'message': 'Environment not found'})
-            
-            # Parse JSON strings
-            import json
-            query_dict = json.loads(query_str) if query_str else {}
-            projection_dict = json.loads(projection_str) if projection_str else None
-            sort_raw = json.loads(sort_str) if sort_str else {}
-            
-            # Convert sort_raw to list of tuples if it's a dict
-            sort_dict = []
-            if isinstance(sort_raw, dict):
-                for k, v in sort_raw.items():
-                    sort_dict.append((k, v))
-            elif isinstance(sort_raw, list):
-                sort_dict = [tuple(x) for x in sort_raw]
-            
-            manager = MongoManager(config['connect_string'], config)
-            
-            if action == 'query':
-                query_result = manager.query(db_name, collection_name, query_dict, projection_dict, sort_dict, limit, skip, is_encrypted)
-                manager.close()
-                return jsonify({
-                    'success': True, 
-                    'results': query_result['results'],
-                    'total_count': query_result['total_count']
-                })
-            else:
-                if not export_path:
-                    manager.close()
-                    return jsonify({'success': False, 'message': 'Export path is required'})
-                
-                export_result = manager.export_data(
-                    db_name, collection_name, query_dict, action, export_path, 
-                    projection_dict, sort_dict, limit, is_encrypted
-                )
+        data, _ = _json()
+        env_name = data.get('env_name')
+        db_name = data.get('db_name')
+        collection_name = data.get('collection_name')
+        query_str = data.get('query', '{}')
+        projection_str = data.get('projection', '{}')
+        sort_str = data.get('sort', '{}')
+        limit = int(data.get('limit', 100))
+        skip = int(data.get('skip', 0))
+        is_encrypted = data.get('is_encrypted', False)
+        
+        action = data.get('action', 'query')
+        export_path = data.get('export_path', '')
+        
+        configs = _get_manager().config_manager.get_mongo_configs()
+        config = next((c for c in configs if c['name'] == env_name), None)
+        
+        if not config:
+            return _ENV_NOT_FOUND
+        
+        # Parse JSON strings with the app's JSON provider (orjson when installed)
+        query_dict = app.json.loads(query_str) if query_str else {}
+        projection_dict = app.json.loads(projection_str) if projection_str else None
+        sort_raw = app.json.loads(sort_str) if sort_str else {}
+        
+        # Convert sort_raw to list of tuples if it's a dict
+        sort_dict = []
+        if isinstance(sort_raw, dict):
+            for k, v in sort_raw.items():
+                sort_dict.append((k, v))
+        elif isinstance(sort_raw, list):
+            sort_dict = [tuple(x) for x in sort_raw]
+        
+        manager = MongoManager(config['connect_string'], config)
+        
+        if action == 'query':
+            query_result = manager.query(db_name, collection_name, query_dict, projection_dict, sort_dict, limit, skip, is_encrypted)
+            manager.close()
+            return jsonify({
+                'success': True, 
+                'results': query_result['results'],
+                'total_count': query_result['total_count']
+            })
+        else:
+            if not export_path:
                 manager.close()
-                return jsonify(export_result)
-        except Exception as e:
-            logger.error(f"Error in mongo query: {e}")
-            return jsonify({'success': False, 'message': str(e)})
+                return _error('Export path is required')
+            
+            export_result = manager.export_data(
+                db_name, collection_name, query_dict, action, export_path, 
+                projection_dict, sort_dict, limit, is_encrypted
+            )
+            manager.close()
+            return jsonify(export_result)
 
     @app.route('/api/mongo/collections/manual', methods=['DELETE'])
     def api_mongo_remove_manual_collection():
-        try:
-            data = request.get_json()
-            env_name = data.get('env_name')
-            collection_name = data.get('collection_name')
-            
-            result = aws_manager.config_manager.remove_manual_collection(env_name, collection_name)
-            return jsonify({'success': result, 'message': 'Collection removed' if result else 'Failed to remove collection'})
-        except Exception as e:
-            return jsonify({'success': False, 'message': str(e)})
+        data, missing = _json('env_name', 'collection_name')
+        env_name = data.get('env_name')
+        collection_name = data.get('collection_name')
+        
+        if missing:
+            return _error('Env name and collection name are required')
+        
+        result = _get_manager().config_manager.remove_manual_collection(env_name, collection_name)
+        return jsonify({'success': result, 'message': 'Collection removed' if result else 'Failed to remove collection'})
 
+    # Build the URL matcher now rather than on the first request
+    app.url_map.update()
     return app
 
-def run_app(host='0.0.0.0', port=5000, debug=False):
-    """Run the Flask application"""
+def run_app(host='0.0.0.0', port=5000, debug=False, threads=16):
+    """Run the Flask application, under waitress when it's installed and not debugging"""
     app = create_app()
-    app.run(host=host, port=port, debug=debug)
+    # Templates only need re-checking on disk while developing
+    app.config['TEMPLATES_AUTO_RELOAD'] = debug
+    app.jinja_env.auto_reload = debug
+    if serve is not None and not debug:
+        # Slow handlers (S3, EFS, Mongo) each hold one of these threads
+        serve(app, host=host, port=port, threads=threads)
+    else:
+        if not debug:
+            logger.info("waitress is not installed; serving with the Flask development server")
+        app.run(host=host, port=port, debug=debug, threaded=True)
@@ -2,81 +2,157 @@
 AWS Credentials Management
 """
 
+import io
 import os
 import re
-import configparser
+import threading
+from contextvars import ContextVar
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 
+from aws_profile_manager.utils import fast_ini
+from aws_profile_manager.utils.files import atomic_write, stat_key
 from aws_profile_manager.utils.logging import LoggerMixin
 
 
+# Resolved once; Path.home() looks up the environment or the password database
+AWS_DIR = Path.home() / '.aws'
+AWS_CREDENTIALS_PATH = AWS_DIR / 'credentials'
+AWS_CONFIG_PATH = AWS_DIR / 'config'
+
+# Lines of a credentials file: a [section] header or a key=value pair
+_SECTION_RE = re.compile(r'^\s*\[([^\]]+)\]\s*$')
+_KV_RE = re.compile(r'^\s*([^=\s][^=]*?)\s*=\s*(.*?)\s*$')
+
+# Profile type/status indexed by (has role_arn) << 1 | (has aws_access_key_id)
+_PROFILE_TYPE = ('unknown', 'credentials', 'role', 'role')
+_PROFILE_STATUS = ('invalid', 'valid', 'role', 'both')
+
+# Marks the parsed credentials file as never read / no longer trustworthy
+_UNREAD = object()
+
+# Temporary credentials (an assumed role held in the web session) for the code
+# running in this context; AWS clients prefer them over the environment/profile
+_session_credentials = ContextVar('session_credentials', default=None)
+
+
+def set_session_credentials(credentials: Optional[Dict[str, str]]) -> None:
+    """Use credentials with AccessKeyId/SecretAccessKey/SessionToken keys, or None for the profile"""
+    _session_credentials.set(credentials)
+
+
+def get_session_credentials() -> Optional[Dict[str, str]]:
+    """Get the session credentials active in this context, if any"""
+    return _session_credentials.get()
+
+
+def credentials_expiration_ts(credentials: Dict[str, str]) -> float:
+    """Get the POSIX expiry of assumed credentials, parsed once when they were stored"""
+    ts = credentials.get('_ExpirationTs')
+    if ts is None:
+        # Stored before the parsed value was kept alongside
+        ts = datetime.fromisoformat(credentials['Expiration'].replace('Z', '+00:00')).timestamp()
+    return ts
+
+
 class AWSCredentialsManager(LoggerMixin):
     """Manages AWS credentials and profiles"""
     
     def __init__(self):
-        self.credentials_path = Path.home() / '.aws' / 'credentials'
-        self.config_path = Path.home() / '.aws' / 'config'
+        self.credentials_path = AWS_CREDENTIALS_PATH
+        self.config_path = AWS_CONFIG_PATH
         self.current_profile = None
+        # list_profiles() result, reused while neither file has changed
+        self._profiles_cache = None
+        self._profiles_cache_key = None
+        # Parsed credentials file shared by the methods that read or edit it. Never
+        # modified in place: edits write a changed copy and swap it in, under the lock
+        self._credentials_doc = {}
+        self._credentials_doc_key = _UNREAD
+        self._credentials_edit_lock = threading.Lock()
+    
+    def _load_credentials_doc(self) -> Dict[str, Dict[str, str]]:
+        """Get the parsed credentials file, re-reading it only when it has changed"""
+        key = stat_key(self.credentials_path)
+        if key != self._credentials_doc_key:
+            self._credentials_doc = fast_ini.read(self.credentials_path) if key else {}
+            self._credentials_doc_key = key
+        return self._credentials_doc
+    
+    def _write_credentials_doc(self, doc: Dict[str, Dict[str, str]]) -> None:
+        """Write an edited copy of the parsed credentials to the file and make it the shared one"""
+        try:
+            fast_ini.write(self.credentials_path, doc)
+        except Exception:
+            self._credentials_doc_key = _UNREAD
+            raise
+        self._credentials_doc = doc
+        self._credentials_doc_key = stat_key(self.credentials_path)
+        self._profiles_cache_key = None
     
     def sync_credentials_from_base(self, base_credentials_path: Path) -> bool:
         """Sync credentials from base file to AWS credentials file"""
         self.logger.info("Syncing credentials from base file")
         
-        if not base_credentials_path.exists():
-            self.logger.error(f"Base credentials file not found: {base_credentials_path}")
-            return False
-        
         try:
-            # Read base credentials
-            with open(base_credentials_path, 'r') as f:
-                base_content = f.read()
-            
-            # Parse credentials from the base file
-            base_credentials = self._parse_credentials(base_content)
+            source_creds = self.load_base_profile(base_credentials_path)
             
-            if not base_credentials:
+            if source_creds is None:
                 self.logger.error("No valid credentials found in base file")
                 return False
             
-            # Get the first profile's credentials or 'default' profile credentials
-            source_creds = None
-            if 'default' in base_credentials:
-                source_creds = base_credentials['default']
-            else:
-                # Take the first available profile
-                source_creds = next(iter(base_credentials.values()))
-            
             if not source_creds or 'aws_access_key_id' not in source_creds:
                 self.logger.error("No valid AWS credentials found in base file")
                 return False
             
-            # Create credentials dictionary with both default and infrrd-master profiles
+            # Create credentials dictionary with both default and infrrd-master profiles;
+            # _update_credentials_file only reads them, so both can share the parsed dict
             credentials_to_write = {
-                'default': source_creds.copy(),
-                'infrrd-master': source_creds.copy()
+                'default': source_creds,
+                'infrrd-master': source_creds
             }
             
             # Update AWS credentials file
             return self._update_credentials_file(credentials_to_write)
             
+        except FileNotFoundError:
+            # Checked by opening it rather than with a separate exists() call
+            self.logger.error(f"Base credentials file not found: {base_credentials_path}")
+            return False
         except Exception as e:
             self.logger.error(f"Failed to sync credentials: {e}")
             return False
     
-    def _parse_credentials(self, content: str) -> Dict[str, Dict[str, str]]:
-        """Parse credentials from base file content"""
+    def load_base_profile(self, base_credentials_path: Path) -> Optional[Dict[str, str]]:
+        """Get the base file profile a sync copies: [default], else the first one (None if empty)"""
+        # Parse credentials from the base file as it is read, stopping once [default] is complete
+        with open(base_credentials_path, 'r') as f:
+            base_credentials = self._parse_credentials(f, stop_after='default')
+        
+        if not base_credentials:
+            return None
+        if 'default' in base_credentials:
+            return base_credentials['default']
+        # Take the first available profile
+        return next(iter(base_credentials.values()))
+    
+    def _parse_credentials(self, lines: Iterable[str], stop_after: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+        """Parse credentials from the lines of a base file (an open file works), up to the end of stop_after"""
         credentials = {}
-        current_profile = None
+        current = None
         
-        for line in content.split('\n'):
-            line = line.strip()
-            if line.startswith('[') and line.endswith(']'):
-                current_profile = line[1:-1]
-                credentials[current_profile] = {}
-            elif '=' in line and current_profile:
-                key, value = line.split('=', 1)
-                credentials[current_profile][key.strip()] = value.strip()
+        for line in lines:
+            match = _SECTION_RE.match(line)
+            if match:
+                if stop_after in credentials:
+                    # The rest of the file is never read
+                    break
+                current = credentials[match.group(1)] = {}
+            elif current is not None:
+                match = _KV_RE.match(line)
+                if match:
+                    current[match.group(1)] = match.group(2)
         
         return credentials
     
@@ -86,14 +162,17 @@ class AWSCredentialsManager(LoggerMixin):
             # Create .aws directory if it doesn't exist
             self.credentials_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Write credentials to file
-            with open(self.credentials_path, 'w') as f:
-                for profile_name, creds in credentials.items():
-                    f.write(f'[{profile_name}]\n')
-                    for key, value in creds.items():
-                        f.write(f'{key}={value}\n')
-                    f.write('\n')
-            
+            # Build the whole file in one buffer and write it in one go
+            buf = io.StringIO()
+            for profile_name, creds in credentials.items():
+                buf.write(f'[{profile_name}]\n')
+                for key, value in creds.items():
+                    buf.write(f'{key}={value}\n')
+                buf.write('\n')
+            with self._credentials_edit_lock:
+                atomic_write(self.credentials_path, buf.getvalue())
+                self._credentials_doc_key = _UNREAD
+            self._profiles_cache_key = None
             self.logger.info(f"Credentials file updated successfully with profiles: {list(credentials.keys())}")
             return True
             
@@ -118,56 +197,54 @@ class AWSCredentialsManager(LoggerMixin):
     
     def _get_profile_status(self, profile_data: Dict[str, str]) -> str:
         """Determine profile status"""
-        if 'role_arn' in profile_data and 'aws_access_key_id' in profile_data:
-            return 'both'
-        elif 'role_arn' in profile_data:
-            return 'role'
-        elif 'aws_access_key_id' in profile_data:
-            return 'valid'
-        else:
-            return 'invalid'
+        return _PROFILE_STATUS[('role_arn' in profile_data) << 1 | ('aws_access_key_id' in profile_data)]
     
     def list_profiles(self) -> Dict[str, Dict[str, str]]:
         """List all available profiles with type information"""
+        # Callers may modify what they get back, so hand out copies
+        return {name: dict(data) for name, data in self.profiles_snapshot().items()}
+    
+    def profiles_snapshot(self) -> Dict[str, Dict[str, str]]:
+        """Shared, read-only profile listing, re-read only when either file changes"""
+        key = (stat_key(self.credentials_path), stat_key(self.config_path))
+        if key != self._profiles_cache_key:
+            self._profiles_cache = self._read_profiles()
+            self._profiles_cache_key = key
+        return self._profiles_cache
+    
+    def get_access_key(self, profile_name: str) -> Optional[str]:
+        """Get a profile's access key id, or None if the profile has none"""
+        return self.profiles_snapshot().get(profile_name, {}).get('aws_access_key_id')
+    
+    def _read_profiles(self) -> Dict[str, Dict[str, str]]:
+        """Build the profile listing from the credentials and config files"""
         profiles = {}
         
-        # Read credentials file
-        if self.credentials_path.exists():
-            config = configparser.ConfigParser()
-            config.read(self.credentials_path)
-            
-            for section in config.sections():
-                profile_data = dict(config[section])
-                # Determine profile type
-                if 'role_arn' in profile_data:
-                    profile_data['type'] = 'role'
-                elif 'aws_access_key_id' in profile_data:
-                    profile_data['type'] = 'credentials'
-                else:
-                    profile_data['type'] = 'unknown'
-                
-                profile_data['status'] = self._get_profile_status(profile_data)
-                profiles[section] = profile_data
+        # Read credentials file; copied, as the parsed file is shared with save/remove
+        for section, values in self._load_credentials_doc().items():
+            profile_data = dict(values)
+            # Determine profile type and status from the same two lookups
+            kind = ('role_arn' in profile_data) << 1 | ('aws_access_key_id' in profile_data)
+            profile_data['type'] = _PROFILE_TYPE[kind]
+            profile_data['status'] = _PROFILE_STATUS[kind]
+            profiles[section] = profile_data
         
         # Also check config file for role profiles
-        if self.config_path.exists():
-            config = configparser.ConfigParser()
-            config.read(self.config_path)
-            
-            for section in config.sections():
-                if section.startswith('profile '):
-                    profile_name = section[8:]  # Remove 'profile ' prefix
-                    if profile_name not in profiles:
-                        profile_data = dict(config[section])
-                        profile_data['type'] = 'role'
-                        profile_data['status'] = self._get_profile_status(profile_data)
-                        profiles[profile_name] = profile_data
-                    else:
-                        # Update existing profile with role info
-                        profiles[profile_name].update(dict(config[section]))
-                        if 'role_arn' in dict(config[section]):
-                            profiles[profile_name]['type'] = 'both'  # Has both credentials and role
-                            profiles[profile_name]['status'] = self._get_profile_status(profiles[profile_name])
+        for section, cfg_section in fast_ini.read(self.config_path).items():
+            if section.startswith('profile '):
+                profile_name = section[8:]  # Remove 'profile ' prefix
+                profile_data = profiles.get(profile_name)
+                if profile_data is None:
+                    cfg_section['type'] = 'role'
+                    cfg_section['status'] = self._get_profile_status(cfg_section)
+                    profiles[profile_name] = cfg_section
+                else:
+                    # Update existing profile with role info
+                    profile_data.update(cfg_section)
+                    if 'role_arn' in cfg_section:
+                        profile_data['type'] = 'both'  # Has both credentials and role
+                        # role_arn is known to be present now, only the access key is left to check
+                        profile_data['status'] = _PROFILE_STATUS[2 | ('aws_access_key_id' in profile_data)]
         
         return profiles
     
@@ -177,24 +254,21 @@ class AWSCredentialsManager(LoggerMixin):
             # Create .aws directory if it doesn't exist
             self.credentials_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Read existing credentials
-            config = configparser.ConfigParser()
-            if self.credentials_path.exists():
-                config.read(self.credentials_path)
-            
-            # Update or create profile
-            if not config.has_section(profile_name):
-                config.add_section(profile_name)
-            
-            config.set(profile_name, 'aws_access_key_id', access_key)
-            config.set(profile_name, 'aws_secret_access_key', secret_key)
-            
-            if session_token:
-                config.set(profile_name, 'aws_session_token', session_token)
-            
-            # Write to file
-            with open(self.credentials_path, 'w') as f:
-                config.write(f)
+            with self._credentials_edit_lock:
+                # Existing credentials, parsed again only if the file changed; other
+                # threads may be reading them, so update a copy
+                config = dict(self._load_credentials_doc())
+                
+                # Update or create profile
+                profile = config[profile_name] = dict(config.get(profile_name, {}))
+                profile['aws_access_key_id'] = access_key
+                profile['aws_secret_access_key'] = secret_key
+                
+                if session_token:
+                    profile['aws_session_token'] = session_token
+                
+                # Write to file
+                self._write_credentials_doc(config)
             
             self.logger.info(f"Credentials saved for profile: {profile_name}")
             return True
@@ -206,19 +280,13 @@ class AWSCredentialsManager(LoggerMixin):
     def remove_profile(self, profile_name: str) -> bool:
         """Remove a profile"""
         try:
-            if not self.credentials_path.exists():
-                return True
-            
-            config = configparser.ConfigParser()
-            config.read(self.credentials_path)
-            
-            if config.has_section(profile_name):
-                config.remove_section(profile_name)
-                
-                with open(self.credentials_path, 'w') as f:
-                    config.write(f)
+            with self._credentials_edit_lock:
+                config = self._load_credentials_doc()
                 
-                self.logger.info(f"Profile removed: {profile_name}")
+                if profile_name in config:
+                    self._write_credentials_doc({name: values for name, values in config.items() if name != profile_name})
+                    
+                    self.logger.info(f"Profile removed: {profile_name}")
             
             return True
             
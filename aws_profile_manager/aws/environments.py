@@ -2,11 +2,12 @@
 AWS Environment Management
 """
 
-import configparser
-from pathlib import Path
 from typing import Dict, Optional
 
+from aws_profile_manager.aws.credentials import AWS_CONFIG_PATH
 from aws_profile_manager.core.config import ConfigManager, get_region_display_name
+from aws_profile_manager.utils import fast_ini
+from aws_profile_manager.utils.files import stat_key
 from aws_profile_manager.utils.logging import LoggerMixin
 
 
@@ -15,56 +16,48 @@ class EnvironmentManager(LoggerMixin):
     
     def __init__(self, config_manager: ConfigManager):
         self.config_manager = config_manager
-        self.config_path = Path.home() / '.aws' / 'config'
+        self.config_path = AWS_CONFIG_PATH
+        # ((config file stat, config version), get_current_environment() result)
+        self._current_env_cache = (None, None)
+        # (config version, list_environments() result); saving the config bumps the version
+        self._environments_cache = (None, None)
     
     def switch_environment(self, env_name: str) -> bool:
         """Switch to a specific environment by updating only the [profile default] section"""
-        self.logger.info(f"Switching to {env_name.upper()} environment")
-
-        environments = self.config_manager.get_environments()
-        if env_name not in environments:
+        env_config = self.config_manager.get_environments().get(env_name)
+        if env_config is None:
             self.logger.error(f"Environment {env_name} not found in configuration")
             return False
 
-        env_config = environments[env_name]
-
         try:
             # Create .aws directory if it doesn't exist
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Read existing config
-            config = configparser.ConfigParser()
-            if self.config_path.exists():
-                config.read(self.config_path)
-
-            # Update ONLY the [profile default] section - don't create multiple profiles
-            if not config.has_section('profile default'):
-                config.add_section('profile default')
-
-            # Set the environment configuration
-            config.set('profile default', 'role_arn', env_config['role_arn'])
-            config.set('profile default', 'region', env_config['region'])
-            config.set('profile default', 'source_profile', 'infrrd-master')
-            config.set('profile default', 'duration_seconds', '3600')
-
-            # Remove any other profile sections that might conflict
-            sections_to_remove = []
-            for section in config.sections():
+            # Keep everything except the other profile sections, which might conflict
+            existing = fast_ini.read(self.config_path)
+            config = {}
+            for section, values in existing.items():
                 if section.startswith('profile ') and section != 'profile default':
-                    sections_to_remove.append(section)
+                    self.logger.info("Removed conflicting profile: %s", section)
+                else:
+                    config[section] = values
 
-            for section in sections_to_remove:
-                config.remove_section(section)
-                self.logger.info(f"Removed conflicting profile: {section}")
+            # Update ONLY the [profile default] section - don't create multiple profiles
+            default_profile = config.setdefault('profile default', {})
+            wanted = {
+                'role_arn': env_config['role_arn'],
+                'region': env_config['region'],
+                'source_profile': 'infrrd-master',
+                'duration_seconds': '3600'
+            }
 
-            # Write to file
-            with open(self.config_path, 'w') as f:
-                config.write(f)
+            # Nothing removed and already pointing at this environment: leave the file alone
+            if len(config) != len(existing) or not wanted.items() <= default_profile.items():
+                default_profile.update(wanted)
+                fast_ini.write(self.config_path, config)
 
-            self.logger.info(f"Switched to {env_name.upper()} environment")
-            self.logger.info(f"Updated [profile default] with role_arn: {env_config['role_arn']}")
-            self.logger.info(f"Updated [profile default] with region: {env_config['region']}")
-            self.logger.info(f"Updated [profile default] with source_profile: infrrd-master")
+            self.logger.info("Switched to %s environment: role_arn=%s region=%s source_profile=infrrd-master",
+                             env_name.upper(), env_config['role_arn'], env_config['region'])
             return True
 
         except Exception as e:
@@ -72,7 +65,12 @@ class EnvironmentManager(LoggerMixin):
             return False
     
     def list_environments(self) -> Dict[str, Dict[str, str]]:
-        """List all available environments"""
+        """List all available environments, rebuilt only when the configuration changes"""
+        version = self.config_manager.version
+        cached_version, cached = self._environments_cache
+        if cached_version == version:
+            return cached
+
         environments = self.config_manager.get_environments()
         result = {}
         
@@ -85,32 +83,29 @@ class EnvironmentManager(LoggerMixin):
                 'description': env_config.get('description', '')
             }
         
+        self._environments_cache = (version, result)
         return result
     
     def get_current_environment(self) -> Optional[str]:
         """Get current environment from AWS config file by checking [profile default]"""
         try:
-            if not self.config_path.exists():
-                return None
-            
-            config = configparser.ConfigParser()
-            config.read(self.config_path)
+            # Answer again without reading anything while neither file nor environments changed
+            key = (stat_key(self.config_path), self.config_manager.version)
+            cached_key, cached_env = self._current_env_cache
+            if key == cached_key:
+                return cached_env
             
-            if 'profile default' not in config.sections():
-                return None
+            env_name = None
+            if key[0] is not None:
+                default_config = fast_ini.read(self.config_path).get('profile default')
+                if default_config is not None:
+                    # Find matching environment
+                    match = self.config_manager.get_environment_index().get(
+                        (default_config.get('role_arn', ''), default_config.get('region', '')))
+                    env_name = match[0] if match else None
             
-            default_config = config['profile default']
-            current_role_arn = default_config.get('role_arn', '')
-            current_region = default_config.get('region', '')
-            
-            # Find matching environment
-            environments = self.config_manager.get_environments()
-            for env_name, env_config in environments.items():
-                if (env_config['role_arn'] == current_role_arn and 
-                    env_config['region'] == current_region):
-                    return env_name
-            
-            return None
+            self._current_env_cache = (key, env_name)
+            return env_name
             
         except Exception as e:
             self.logger.error(f"Failed to get current environment: {e}")
@@ -138,16 +133,17 @@ class EnvironmentManager(LoggerMixin):
         try:
             environments = self.config_manager.get_environments()
             
-            if env_name not in environments:
+            env_config = environments.get(env_name)
+            if env_config is None:
                 self.logger.error(f"Environment {env_name} not found")
                 return False
             
             if region is not None:
-                environments[env_name]['region'] = region
+                env_config['region'] = region
             if role_arn is not None:
-                environments[env_name]['role_arn'] = role_arn
+                env_config['role_arn'] = role_arn
             if description is not None:
-                environments[env_name]['description'] = description
+                env_config['description'] = description
             
             self.config_manager.set('environments', environments)
             return self.config_manager.save_config()
@@ -161,8 +157,7 @@ class EnvironmentManager(LoggerMixin):
         try:
             environments = self.config_manager.get_environments()
             
-            if env_name in environments:
-                del environments[env_name]
+            if environments.pop(env_name, None) is not None:
                 self.config_manager.set('environments', environments)
                 return self.config_manager.save_config()
             
@@ -2,42 +2,124 @@
 Configuration management for AWS Profile Manager
 """
 
+import itertools
 import json
 import logging
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Final, Mapping, Optional
+
+from aws_profile_manager.utils.files import atomic_write, stat_key
 
 logger = logging.getLogger(__name__)
 
+# Parsed config files shared by the ConfigManagers of this process, so building another
+# manager for an unchanged file skips the read and JSON decode. Managers of the same
+# file therefore see one config dict. resolved path -> (stat_key, _SharedConfig)
+_CONFIG_CACHE = {}
+_CONFIG_CACHE_LOCK = threading.Lock()
+
+# Config versions are drawn from one counter, so a manager never sees a number again
+# after moving to another _SharedConfig
+_VERSIONS = itertools.count(1)
+
+
+class _SharedConfig:
+    """A config dict, its version and the lock serializing its saves, shared by every manager holding the dict"""
+    
+    __slots__ = ('data', 'version', 'write_lock')
+    
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.version = next(_VERSIONS)
+        self.write_lock = threading.Lock()
+
 
 class ConfigManager:
-    """Manages application configuration"""
+    """Manages application configuration
+
+    Managers of the same file share one mutable config dict: a change made through
+    one, saved or not, is seen by all of them.
+    """
+    
+    # Top-level keys that always exist once loaded, so callers (and the getters
+    # below) can index them directly instead of .get() with a default
+    DEFAULT_SECTIONS = {
+        'base_credentials_path': str,
+        'environments': dict,
+        'credentials_profiles': dict,
+        'assume_role_configs': dict,
+        'predefined_buckets': list,
+        'custom_buckets': list,
+        'efs_connections': list,
+        'mongo_configs': list,
+    }
     
     def __init__(self, config_file: str = 'config.json'):
         self.config_file = Path(config_file)
-        self.config = {}
+        self._shared = _SharedConfig({})
+        self.config = self._shared.data
+        self._env_index = None
+        self._env_index_version = None
+        self._env_index_lock = threading.Lock()
         self.load_config()
+        self._ensure_sections()
+    
+    @property
+    def version(self) -> int:
+        """Changes whenever any manager sharing the config loads or saves it, so derived data can be rebuilt"""
+        return self._shared.version
+    
+    def _bump_version(self) -> None:
+        """Mark the shared config as changed"""
+        self._shared.version = next(_VERSIONS)
+    
+    def _ensure_sections(self) -> None:
+        """Create any missing default sections"""
+        for key, factory in self.DEFAULT_SECTIONS.items():
+            self.config.setdefault(key, factory())
     
     def load_config(self) -> bool:
         """Load configuration from JSON file"""
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r') as f:
-                    self.config = json.load(f)
-                logger.info("Configuration loaded successfully")
-                return True
-            except Exception as e:
-                logger.error(f"Failed to load configuration: {e}")
-                return False
-        else:
+        try:
+            path = self.config_file.resolve()
+            key = stat_key(path)
+            with _CONFIG_CACHE_LOCK:
+                cached = _CONFIG_CACHE.get(path)
+            if key is not None and cached is not None and cached[0] == key:
+                self._shared = cached[1]
+            else:
+                with open(path, 'r') as f:
+                    self._shared = _SharedConfig(json.load(f))
+                self.config = self._shared.data
+                # Completed before other managers can get hold of it
+                self._ensure_sections()
+                with _CONFIG_CACHE_LOCK:
+                    _CONFIG_CACHE[path] = (key, self._shared)
+            # A fresh parse comes with a new version; a cache hit keeps the shared one,
+            # so building a throwaway manager doesn't invalidate everyone's derived data
+            self.config = self._shared.data
+            logger.info("Configuration loaded successfully")
+            return True
+        except FileNotFoundError:
             logger.warning(f"Configuration file {self.config_file} not found")
             return False
+        except Exception as e:
+            logger.error(f"Failed to load configuration: {e}")
+            return False
     
     def save_config(self) -> bool:
-        """Save configuration to JSON file"""
+        """Save configuration to JSON file, replacing it atomically"""
+        self._bump_version()
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            # Serialize in one go and swap the file in, so readers never see a partial config
+            data = json.dumps(self.config, indent=2)
+            with self._shared.write_lock:
+                atomic_write(self.config_file, data)
+                path = self.config_file.resolve()
+                with _CONFIG_CACHE_LOCK:
+                    _CONFIG_CACHE[path] = (stat_key(path), self._shared)
             logger.info("Configuration saved successfully")
             return True
         except Exception as e:
@@ -54,27 +136,39 @@ class ConfigManager:
     
     def get_environments(self) -> Dict[str, Any]:
         """Get environments configuration"""
-        return self.config.get('environments', {})
+        return self.config['environments']
+    
+    def get_environment_index(self) -> Dict[tuple, tuple]:
+        """Get (env_name, env_config) keyed on (role_arn, region), rebuilt when the config changes"""
+        with self._env_index_lock:
+            if self._env_index_version != self.version:
+                # Built in reverse so the first matching environment wins
+                self._env_index = {
+                    (env_config['role_arn'], env_config['region']): (env_name, env_config)
+                    for env_name, env_config in reversed(list(self.config['environments'].items()))
+                }
+                self._env_index_version = self.version
+            return self._env_index
     
     def get_assume_role_configs(self) -> Dict[str, Any]:
         """Get assume role configurations"""
-        return self.config.get('assume_role_configs', {})
+        return self.config['assume_role_configs']
     
     def get_credentials_profiles(self) -> Dict[str, Any]:
         """Get credentials profiles configuration"""
-        return self.config.get('credentials_profiles', {})
+        return self.config['credentials_profiles']
     
     def get_base_credentials_path(self) -> str:
         """Get base credentials path"""
-        return self.config.get('base_credentials_path', '')
+        return self.config['base_credentials_path']
     
     def get_predefined_buckets(self) -> list:
         """Get predefined buckets configuration"""
-        return self.config.get('predefined_buckets', [])
+        return self.config['predefined_buckets']
 
     def get_efs_connections(self) -> list:
         """Get all EFS connections"""
-        connections = self.config.get('efs_connections', [])
+        connections = self.config['efs_connections']
         # Ensure name exists for all connections
         updated = False
         for i, conn in enumerate(connections):
@@ -87,9 +181,6 @@ class ConfigManager:
 
     def add_efs_connection(self, host: str, username: str, key_path: str = '', name: str = '') -> bool:
         """Add a new EFS connection"""
-        if 'efs_connections' not in self.config:
-            self.config['efs_connections'] = []
-        
         if not name:
             name = f"Connection {len(self.config['efs_connections']) + 1}"
             
@@ -105,7 +196,7 @@ class ConfigManager:
 
     def update_efs_connection(self, index: int, host: str, username: str, key_path: str = '', name: str = '') -> bool:
         """Update an existing EFS connection"""
-        connections = self.config.get('efs_connections', [])
+        connections = self.config['efs_connections']
         if 0 <= index < len(connections):
             connections[index] = {
                 'name': name or connections[index].get('name', f"Connection {index+1}"),
@@ -119,7 +210,7 @@ class ConfigManager:
 
     def remove_efs_connection(self, index: int) -> bool:
         """Remove EFS connection by index"""
-        connections = self.config.get('efs_connections', [])
+        connections = self.config['efs_connections']
         if 0 <= index < len(connections):
             connections.pop(index)
             self.config['efs_connections'] = connections
@@ -135,13 +226,10 @@ class ConfigManager:
 
     def get_mongo_configs(self) -> List[Dict[str, Any]]:
         """Get all MongoDB configurations"""
-        return self.config.get('mongo_configs', [])
+        return self.config['mongo_configs']
 
     def add_mongo_config(self, name: str, connect_string: str, username: str = '', password: str = '', default_database: str = '') -> bool:
         """Add a new MongoDB configuration"""
-        if 'mongo_configs' not in self.config:
-            self.config['mongo_configs'] = []
-        
         config = {
             'name': name,
             'connect_string': connect_string,
@@ -163,7 +251,7 @@ class ConfigManager:
 
     def remove_mongo_config(self, name: str) -> bool:
         """Remove MongoDB configuration by name"""
-        configs = self.config.get('mongo_configs', [])
+        configs = self.config['mongo_configs']
         new_configs = [c for c in configs if c['name'] != name]
         if len(new_configs) != len(configs):
             self.config['mongo_configs'] = new_configs
@@ -172,7 +260,7 @@ class ConfigManager:
 
     def add_manual_collection(self, env_name: str, collection_name: str) -> bool:
         """Add a manual collection to an environment's favorite list"""
-        configs = self.config.get('mongo_configs', [])
+        configs = self.config['mongo_configs']
         for config in configs:
             if config['name'] == env_name:
                 if 'manual_collections' not in config:
@@ -184,7 +272,7 @@ class ConfigManager:
 
     def remove_manual_collection(self, env_name: str, collection_name: str) -> bool:
         """Remove a manual collection from an environment's favorite list"""
-        configs = self.config.get('mongo_configs', [])
+        configs = self.config['mongo_configs']
         for config in configs:
             if config['name'] == env_name:
                 if 'manual_collections' in config and collection_name in config['manual_collections']:
@@ -194,7 +282,7 @@ class ConfigManager:
 
     def add_manual_database(self, env_name: str, db_name: str) -> bool:
         """Add a manual database to an environment's favorite list"""
-        configs = self.config.get('mongo_configs', [])
+        configs = self.config['mongo_configs']
         for config in configs:
             if config['name'] == env_name:
                 if 'manual_databases' not in config:
@@ -206,7 +294,7 @@ class ConfigManager:
 
     def remove_manual_database(self, env_name: str, db_name: str) -> bool:
         """Remove a manual database from an environment's favorite list"""
-        configs = self.config.get('mongo_configs', [])
+        configs = self.config['mongo_configs']
         for config in configs:
             if config['name'] == env_name:
                 if 'manual_databases' in config and db_name in config['manual_databases']:
@@ -216,23 +304,26 @@ class ConfigManager:
 
 
 
+# Built once; get_region_display_name is called per environment on every listing
+_REGION_DISPLAY: Final[Mapping[str, str]] = MappingProxyType({
+    'us-east-1': 'US East 1 (N. Virginia)',
+    'us-east-2': 'US East 2 (Ohio)',
+    'us-west-1': 'US West 1 (N. California)',
+    'us-west-2': 'US West 2 (Oregon)',
+    'eu-west-1': 'Europe West 1 (Ireland)',
+    'eu-west-2': 'Europe West 2 (London)',
+    'eu-west-3': 'Europe West 3 (Paris)',
+    'eu-central-1': 'Europe Central 1 (Frankfurt)',
+    'ap-southeast-1': 'Asia Pacific 1 (Singapore)',
+    'ap-southeast-2': 'Asia Pacific 2 (Sydney)',
+    'ap-northeast-1': 'Asia Pacific 3 (Tokyo)',
+    'ap-northeast-2': 'Asia Pacific 4 (Seoul)',
+    'ap-south-1': 'Asia Pacific 5 (Mumbai)',
+    'ca-central-1': 'Canada Central 1 (Toronto)',
+    'sa-east-1': 'South America 1 (São Paulo)'
+})
+
+
 def get_region_display_name(region_code: str) -> str:
     """Get human-readable region name"""
-    region_mapping = {
-        'us-east-1': 'US East 1 (N. Virginia)',
-        'us-east-2': 'US East 2 (Ohio)',
-        'us-west-1': 'US West 1 (N. California)',
-        'us-west-2': 'US West 2 (Oregon)',
-        'eu-west-1': 'Europe West 1 (Ireland)',
-        'eu-west-2': 'Europe West 2 (London)',
-        'eu-west-3': 'Europe West 3 (Paris)',
-        'eu-central-1': 'Europe Central 1 (Frankfurt)',
-        'ap-southeast-1': 'Asia Pacific 1 (Singapore)',
-        'ap-southeast-2': 'Asia Pacific 2 (Sydney)',
-        'ap-northeast-1': 'Asia Pacific 3 (Tokyo)',
-        'ap-northeast-2': 'Asia Pacific 4 (Seoul)',
-        'ap-south-1': 'Asia Pacific 5 (Mumbai)',
-        'ca-central-1': 'Canada Central 1 (Toronto)',
-        'sa-east-1': 'South America 1 (São Paulo)'
-    }
-    return region_mapping.get(region_code, region_code)
+    return _REGION_DISPLAY.get(region_code, region_code)
@@ -2,15 +2,12 @@
 Main AWS Profile Manager
 """
 
+import importlib
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
 from aws_profile_manager.core.config import ConfigManager
-from aws_profile_manager.aws.credentials import AWSCredentialsManager
-from aws_profile_manager.aws.environments import EnvironmentManager
-from aws_profile_manager.roles.assume_role import AWSRoleManager
-from aws_profile_manager.s3.manager import S3Manager
-from aws_profile_manager.efs.manager import EFSManager
 from aws_profile_manager.utils.logging import LoggerMixin, setup_logging
 
 
@@ -21,16 +18,58 @@ class AWSProfileManager(LoggerMixin):
         # Setup logging
         setup_logging()
         
-        # Initialize components
+        # Initialize components; the subsystem managers are built on first use
         self.config_manager = ConfigManager(config_file)
-        self.credentials_manager = AWSCredentialsManager()
-        self.environment_manager = EnvironmentManager(self.config_manager)
-        self.role_manager = AWSRoleManager()
-        self.s3_manager = S3Manager()
-        self.efs_manager = EFSManager()
+        self._components = {}
+        self._components_lock = threading.Lock()
         
         self.logger.info("AWS Profile Manager initialized")
     
+    def _component(self, name: str, module: str, class_name: str, *args):
+        """Get a subsystem manager, importing and building it the first time it is needed"""
+        component = self._components.get(name)
+        if component is None:
+            with self._components_lock:
+                component = self._components.get(name)
+                if component is None:
+                    component_class = getattr(importlib.import_module(module), class_name)
+                    component = self._components[name] = component_class(*args)
+        return component
+    
+    @property
+    def credentials_manager(self):
+        """AWS credentials and profiles"""
+        return self._component('credentials_manager', 'aws_profile_manager.aws.credentials', 'AWSCredentialsManager')
+    
+    @property
+    def environment_manager(self):
+        """AWS environments"""
+        return self._component('environment_manager', 'aws_profile_manager.aws.environments', 'EnvironmentManager',
+                               self.config_manager)
+    
+    @property
+    def role_manager(self):
+        """Role assumption (imports boto3)"""
+        return self._component('role_manager', 'aws_profile_manager.roles.assume_role', 'AWSRoleManager')
+    
+    @property
+    def s3_manager(self):
+        """S3 operations (imports boto3)"""
+        return self._component('s3_manager', 'aws_profile_manager.s3.manager', 'S3Manager')
+    
+    @property
+    def efs_manager(self):
+        """EFS over SFTP (imports paramiko)"""
+        return self._component('efs_manager', 'aws_profile_manager.efs.manager', 'EFSManager')
+    
+    def _clear_client_caches(self):
+        """Drop cached AWS clients after the credentials behind them change"""
+        # Managers that were never built have no clients to drop
+        for name in ('s3_manager', 'role_manager'):
+            component = self._components.get(name)
+            if component is not None:
+                component.clear_client_cache()
+    
     def sync_credentials(self) -> bool:
         """Sync credentials from base file"""
         base_path = self.config_manager.get_base_credentials_path()
@@ -38,15 +77,24 @@ class AWSProfileManager(LoggerMixin):
             self.logger.error("Base credentials path not configured")
             return False
         
-        return self.credentials_manager.sync_credentials_from_base(Path(base_path).expanduser())
+        synced = self.credentials_manager.sync_credentials_from_base(Path(base_path).expanduser())
+        if synced:
+            self._clear_client_caches()
+        return synced
     
     def switch_profile(self, profile_name: str) -> bool:
         """Switch to a specific profile"""
-        return self.credentials_manager.switch_profile(profile_name)
+        switched = self.credentials_manager.switch_profile(profile_name)
+        if switched:
+            self._clear_client_caches()
+        return switched
     
     def switch_environment(self, env_name: str) -> bool:
         """Switch to a specific environment"""
-        return self.environment_manager.switch_environment(env_name)
+        switched = self.environment_manager.switch_environment(env_name)
+        if switched:
+            self._clear_client_caches()
+        return switched
     
     def list_profiles(self) -> Dict[str, Dict[str, str]]:
         """List all profiles"""
@@ -58,7 +106,10 @@ class AWSProfileManager(LoggerMixin):
     
     def save_credentials(self, profile_name: str, access_key: str, secret_key: str, session_token: str = None) -> bool:
         """Save credentials for a profile"""
-        return self.credentials_manager.save_credentials(profile_name, access_key, secret_key, session_token)
+        saved = self.credentials_manager.save_credentials(profile_name, access_key, secret_key, session_token)
+        if saved:
+            self._clear_client_caches()
+        return saved
     
     def save_role_profile(self, profile_name: str, role_arn: str, source_profile: str, region: str = 'us-east-1', external_id: str = None, duration_seconds: int = 3600) -> bool:
         """Save a role-based profile"""
@@ -273,41 +324,47 @@ class AWSProfileManager(LoggerMixin):
     
     def remove_profile(self, profile_name: str) -> bool:
         """Remove a profile"""
-        return self.credentials_manager.remove_profile(profile_name)
+        removed = self.credentials_manager.remove_profile(profile_name)
+        if removed:
+            self._clear_client_caches()
+        return removed
 
     def get_credentials_status(self) -> Dict:
         """Get credentials status information"""
         try:
             base_path_str = self.config_manager.get_base_credentials_path()
             base_path = Path(base_path_str).expanduser() if base_path_str else None
-            base_file_exists = base_path.exists() if base_path else False
             
-            # Check default profile
-            profiles = self.credentials_manager.list_profiles()
-            default_profile_valid = 'default' in profiles and 'aws_access_key_id' in profiles.get('default', {})
+            # Read the access key of the profile a sync would copy; opening the file
+            # doubles as the existence check
+            base_file_exists = False
+            base_access_key = "N/A"
+            if base_path:
+                try:
+                    base_profile = self.credentials_manager.load_base_profile(base_path)
+                    base_file_exists = True
+                    if base_profile:
+                        base_access_key = base_profile.get('aws_access_key_id', 'N/A')
+                except FileNotFoundError:
+                    pass
+                except (OSError, UnicodeDecodeError):
+                    # The file exists but can't be read or isn't text
+                    base_file_exists = True
             
-            # Check infrrd-master profile
-            infrrd_master_valid = 'infrrd-master' in profiles and 'aws_access_key_id' in profiles.get('infrrd-master', {})
+            # Check default and infrrd-master profiles
+            default_access_key = self.credentials_manager.get_access_key('default')
+            default_profile_valid = default_access_key is not None
+            infrrd_access_key = self.credentials_manager.get_access_key('infrrd-master')
+            infrrd_master_valid = infrrd_access_key is not None
             
             # Check if in sync (simplified check)
             in_sync = base_file_exists and default_profile_valid
             
-            # Get access keys
-            base_access_key = "N/A"
-            default_access_key = profiles.get('default', {}).get('aws_access_key_id', 'N/A')
-            infrrd_access_key = profiles.get('infrrd-master', {}).get('aws_access_key_id', 'N/A')
-            
-            if base_file_exists:
-                try:
-                    with open(base_path, 'r') as f:
-                        content = f.read()
-                        # Simple extraction of access key
-                        for line in content.split('\n'):
-                            if 'aws_access_key_id' in line and '=' in line:
-                                base_access_key = line.split('=')[1].strip()
-                                break
-                except:
-                    pass
+            # Access keys shown when a profile has none
+            if default_access_key is None:
+                default_access_key = 'N/A'
+            if infrrd_access_key is None:
+                infrrd_access_key = 'N/A'
             
             # Check if base credentials are valid (has access key)
             base_credentials_valid = base_file_exists and base_access_key != 'N/A' and base_access_key.strip() != ''
@@ -5,6 +5,9 @@ EFS (SFTP) Operations Management
 import os
 import paramiko
 import stat
+import tempfile
+import traceback
+import zipfile
 from datetime import datetime
 from typing import Dict, List, Optional, Union
 from pathlib import Path
@@ -195,7 +198,6 @@ class EFSManager(LoggerMixin):
         try:
             handler = self._get_handler(config)
             if not local_path:
-                import tempfile
                 local_path = os.path.join(tempfile.gettempdir(), os.path.basename(remote_path))
 
             handler.sftp_client.get(remote_path, local_path)
@@ -213,7 +215,6 @@ class EFSManager(LoggerMixin):
         try:
             handler = self._get_handler(config)
             sftp = handler.sftp_client
-            import tempfile, zipfile
             
             local_zip_path = os.path.join(tempfile.gettempdir(), f"{os.path.basename(remote_path)}.zip")
             
@@ -281,7 +282,6 @@ class EFSManager(LoggerMixin):
             return {'success': True, 'message': f'Successfully downloaded to {local_dest_dir}', 'local_path': local_dest_dir}
         except Exception as e:
             self.logger.error(f"Error recursive download: {e}")
-            import traceback
             self.logger.error(traceback.format_exc())
             return {'success': False, 'message': str(e)}
         finally:
@@ -3,25 +3,42 @@ AWS Role Assumption Management
 """
 
 import configparser
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional, Union
 
 try:
     import boto3
+    from botocore.config import Config
     from botocore.exceptions import ClientError, NoCredentialsError
     BOTO3_AVAILABLE = True
+    # Shared by the cached STS clients so their HTTPS connections are pooled and reused
+    STS_CLIENT_CONFIG = Config(max_pool_connections=20, retries={'max_attempts': 3, 'mode': 'adaptive'})
 except ImportError:
     BOTO3_AVAILABLE = False
 
+from aws_profile_manager.aws.credentials import AWS_CONFIG_PATH, AWS_CREDENTIALS_PATH
+from aws_profile_manager.core.config import ConfigManager
+from aws_profile_manager.utils.files import stat_key
 from aws_profile_manager.utils.logging import LoggerMixin
 
+# Most profiles list_available_profiles checks at the same time
+PROFILE_CHECK_WORKERS = 16
+
 
 class AWSRoleManager(LoggerMixin):
     """Manages AWS role assumption and role-based profiles"""
     
     def __init__(self):
-        self.config_path = Path.home() / '.aws' / 'config'
-        self.credentials_path = Path.home() / '.aws' / 'credentials'
+        self.config_path = AWS_CONFIG_PATH
+        self.credentials_path = AWS_CREDENTIALS_PATH
+        # STS clients by (requested source profile, credentials file stat, config file stat);
+        # a None profile is the auto-detected base profile
+        self._sts_clients = {}
+        self._sts_clients_lock = threading.Lock()
 
     def _get_credentials_from_file(self, profile_name: str) -> Optional[Dict[str, str]]:
         """Read credentials directly from the credentials file"""
@@ -70,8 +87,30 @@ class AWSRoleManager(LoggerMixin):
             return None
     
     def _create_sts_client(self, profile_name: str = None) -> Optional[object]:
+        """Get the STS client for a source profile, resolving and verifying it only on first use"""
+        # Profile credentials are read from the files when the client is built, so a
+        # changed file (edited here, by the CLI or by hand) needs a new client
+        key = (profile_name, stat_key(self.credentials_path), stat_key(self.config_path))
+        with self._sts_clients_lock:
+            sts_client = self._sts_clients.get(key)
+        if sts_client is None:
+            # Built without the lock held, as verifying it makes network calls
+            sts_client = self._build_sts_client(profile_name)
+            if sts_client is not None:
+                with self._sts_clients_lock:
+                    # Clients built from older versions of the files are no use any more
+                    for stale in [k for k in self._sts_clients if k[0] == profile_name and k != key]:
+                        del self._sts_clients[stale]
+                    sts_client = self._sts_clients.setdefault(key, sts_client)
+        return sts_client
+
+    def clear_client_cache(self):
+        """Drop cached STS clients so the next call re-resolves credentials"""
+        with self._sts_clients_lock:
+            self._sts_clients.clear()
+
+    def _build_sts_client(self, profile_name: str = None) -> Optional[object]:
         """Create STS client with proper credential isolation"""
-        import os
 
         # Store current environment variables
         old_env = {}
@@ -87,7 +126,6 @@ class AWSRoleManager(LoggerMixin):
                 profile_to_use = profile_name
             else:
                 # Check config for preferred base profile
-                from aws_profile_manager.core.config import ConfigManager
                 config_manager = ConfigManager()
                 config = config_manager.config
                 preferred_profile = config.get('base_profile', 'default')
@@ -128,7 +166,8 @@ class AWSRoleManager(LoggerMixin):
                     self.logger.warning("No preferred base profile found, using 'default'")
 
             # Create STS client using the determined profile
-            sts_client = boto3.Session(profile_name=profile_to_use).client('sts', region_name='us-east-1')
+            sts_client = boto3.Session(profile_name=profile_to_use).client('sts', region_name='us-east-1',
+                                                                           config=STS_CLIENT_CONFIG)
 
             # Verify credentials
             try:
@@ -222,6 +261,9 @@ class AWSRoleManager(LoggerMixin):
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
             self.logger.error(f"Failed to assume role: {error_code} - {error_message}")
+            if error_code in ('ExpiredToken', 'InvalidClientTokenId'):
+                # The cached source credentials are no longer valid
+                self.clear_client_cache()
             
             return {
                 'success': False,
@@ -230,6 +272,7 @@ class AWSRoleManager(LoggerMixin):
             
         except NoCredentialsError:
             self.logger.error("No AWS credentials found")
+            self.clear_client_cache()
             return {
                 'success': False,
                 'message': 'No AWS credentials found. Please configure your credentials first.'
@@ -242,56 +285,6 @@ class AWSRoleManager(LoggerMixin):
                 'message': f'Unexpected error: {str(e)}'
             }
 
-    def list_available_profiles(self) -> Dict[str, Dict[str, str]]:
-        """List available AWS profiles and their account information"""
-        profiles_info = {}
-
-        try:
-            # Check both credentials file and config file
-            credentials_path = Path.home() / '.aws' / 'credentials'
-
-            profiles_to_check = []
-
-            # Get profiles from credentials file
-            if credentials_path.exists():
-                import configparser
-                cred_config = configparser.ConfigParser()
-                cred_config.read(credentials_path)
-                profiles_to_check.extend(cred_config.sections())
-
-            # Add default if not already there
-            if 'default' not in profiles_to_check:
-                profiles_to_check.append('default')
-
-            for profile_name in profiles_to_check:
-                try:
-                    # Test the profile
-                    session = boto3.Session(profile_name=profile_name)
-                    sts_client = session.client('sts', region_name='us-east-1')
-                    identity = sts_client.get_caller_identity()
-
-                    profiles_info[profile_name] = {
-                        'account_id': identity.get('Account'),
-                        'user_id': identity.get('UserId'),
-                        'arn': identity.get('Arn'),
-                        'available': True,
-                        'error': None
-                    }
-
-                except Exception as e:
-                    profiles_info[profile_name] = {
-                        'account_id': None,
-                        'user_id': None,
-                        'arn': None,
-                        'available': False,
-                        'error': str(e)
-                    }
-
-        except Exception as e:
-            self.logger.error(f"Error listing profiles: {e}")
-
-        return profiles_info
-    
     def _save_assumed_credentials(self, profile_name: str, access_key: str, secret_key: str, session_token: str) -> bool:
         """Save assumed role credentials to AWS credentials file"""
         try:
@@ -448,6 +441,9 @@ export AWS_SESSION_TOKEN={credentials['SessionToken']}"""
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
             self.logger.error(f"Failed to assume role: {error_code} - {error_message}")
+            if error_code in ('ExpiredToken', 'InvalidClientTokenId'):
+                # The cached source credentials are no longer valid
+                self.clear_client_cache()
             
             return {
                 'success': False,
@@ -456,6 +452,7 @@ export AWS_SESSION_TOKEN={credentials['SessionToken']}"""
             
         except NoCredentialsError:
             self.logger.error("No AWS credentials found")
+            self.clear_client_cache()
             return {
                 'success': False,
                 'message': 'No AWS credentials found. Please configure your credentials first.'
@@ -468,56 +465,6 @@ export AWS_SESSION_TOKEN={credentials['SessionToken']}"""
                 'message': f'Unexpected error: {str(e)}'
             }
 
-    def list_available_profiles(self) -> Dict[str, Dict[str, str]]:
-        """List available AWS profiles and their account information"""
-        profiles_info = {}
-
-        try:
-            # Check both credentials file and config file
-            credentials_path = Path.home() / '.aws' / 'credentials'
-
-            profiles_to_check = []
-
-            # Get profiles from credentials file
-            if credentials_path.exists():
-                import configparser
-                cred_config = configparser.ConfigParser()
-                cred_config.read(credentials_path)
-                profiles_to_check.extend(cred_config.sections())
-
-            # Add default if not already there
-            if 'default' not in profiles_to_check:
-                profiles_to_check.append('default')
-
-            for profile_name in profiles_to_check:
-                try:
-                    # Test the profile
-                    session = boto3.Session(profile_name=profile_name)
-                    sts_client = session.client('sts', region_name='us-east-1')
-                    identity = sts_client.get_caller_identity()
-
-                    profiles_info[profile_name] = {
-                        'account_id': identity.get('Account'),
-                        'user_id': identity.get('UserId'),
-                        'arn': identity.get('Arn'),
-                        'available': True,
-                        'error': None
-                    }
-
-                except Exception as e:
-                    profiles_info[profile_name] = {
-                        'account_id': None,
-                        'user_id': None,
-                        'arn': None,
-                        'available': False,
-                        'error': str(e)
-                    }
-
-        except Exception as e:
-            self.logger.error(f"Error listing profiles: {e}")
-
-        return profiles_info
-    
     def assume_role_via_script(self, role_arn: str, session_name: str, external_id: Optional[str] = None, 
                               cleanup: bool = True) -> Dict[str, Union[bool, str]]:
         """
@@ -535,8 +482,6 @@ export AWS_SESSION_TOKEN={credentials['SessionToken']}"""
         Returns:
             Dict with success status, script path, and sourcing instructions
         """
-        import tempfile
-        import os
         
         try:
             # Create temporary script file
@@ -676,7 +621,6 @@ echo "⏰ Credentials will expire in 1 hour"
 """
             
             # Write the script
-            from pathlib import Path
             script_path = Path(output_file)
             script_path.write_text(script_content)
             script_path.chmod(0o755)
@@ -892,19 +836,43 @@ echo "⏰ Credentials will expire in 1 hour"
                 'message': f'Unexpected error: {str(e)}'
             }
 
+    def _describe_profile(self, profile_name: str) -> Dict[str, str]:
+        """Get the caller identity of one profile"""
+        try:
+            # Sessions aren't thread-safe, so each profile check gets its own
+            session = boto3.Session(profile_name=profile_name)
+            sts_client = session.client('sts', region_name='us-east-1')
+            identity = sts_client.get_caller_identity()
+
+            return {
+                'account_id': identity.get('Account'),
+                'user_id': identity.get('UserId'),
+                'arn': identity.get('Arn'),
+                'available': True,
+                'error': None
+            }
+
+        except Exception as e:
+            return {
+                'account_id': None,
+                'user_id': None,
+                'arn': None,
+                'available': False,
+                'error': str(e)
+            }
+
     def list_available_profiles(self) -> Dict[str, Dict[str, str]]:
         """List available AWS profiles and their account information"""
         profiles_info = {}
 
         try:
             # Check credentials file
-            credentials_path = Path.home() / '.aws' / 'credentials'
+            credentials_path = self.credentials_path
 
             profiles_to_check = []
 
             # Get profiles from credentials file
             if credentials_path.exists():
-                import configparser
                 cred_config = configparser.ConfigParser()
                 cred_config.read(credentials_path)
                 profiles_to_check.extend(cred_config.sections())
@@ -913,29 +881,10 @@ echo "⏰ Credentials will expire in 1 hour"
             if 'default' not in profiles_to_check:
                 profiles_to_check.append('default')
 
-            for profile_name in profiles_to_check:
-                try:
-                    # Test the profile
-                    session = boto3.Session(profile_name=profile_name)
-                    sts_client = session.client('sts', region_name='us-east-1')
-                    identity = sts_client.get_caller_identity()
-
-                    profiles_info[profile_name] = {
-                        'account_id': identity.get('Account'),
-                        'user_id': identity.get('UserId'),
-                        'arn': identity.get('Arn'),
-                        'available': True,
-                        'error': None
-                    }
-
-                except Exception as e:
-                    profiles_info[profile_name] = {
-                        'account_id': None,
-                        'user_id': None,
-                        'arn': None,
-                        'available': False,
-                        'error': str(e)
-                    }
+            # Each check is an STS round trip, so run them side by side
+            with ThreadPoolExecutor(max_workers=min(PROFILE_CHECK_WORKERS, len(profiles_to_check))) as executor:
+                results = executor.map(self._describe_profile, profiles_to_check)
+                profiles_info = dict(zip(profiles_to_check, results))
 
         except Exception as e:
             self.logger.error(f"Error listing profiles: {e}")
@@ -3,59 +3,120 @@ S3 Operations Management
 """
 
 import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
 try:
     import boto3
+    from botocore.config import Config
     from botocore.exceptions import ClientError, NoCredentialsError
     BOTO3_AVAILABLE = True
+    # Shared by every cached client: a larger keep-alive connection pool for
+    # concurrent requests and adaptive retries for throttling
+    CLIENT_CONFIG = Config(signature_version='s3v4',
+                           max_pool_connections=50,
+                           tcp_keepalive=True,
+                           retries={'max_attempts': 5, 'mode': 'adaptive'})
 except ImportError:
     BOTO3_AVAILABLE = False
 
+from aws_profile_manager.aws.credentials import (
+    AWS_CONFIG_PATH, AWS_CREDENTIALS_PATH, credentials_expiration_ts, get_session_credentials
+)
+from aws_profile_manager.utils.files import stat_key
 from aws_profile_manager.utils.logging import LoggerMixin
 
 
+# Most credential sources with a cached session; every assume-role or refresh is a new one
+MAX_CACHED_SESSIONS = 8
+
+
 class S3Manager(LoggerMixin):
     """Manages S3 operations like listing buckets, objects, and downloading files"""
     
     def __init__(self):
         if not BOTO3_AVAILABLE:
             self.logger.warning("boto3 is not available. S3 operations will not work.")
+        # Sessions keyed by credential source and clients by (service, credential
+        # source); creating either costs far more than any single call we make.
+        # Sessions hold (session, expiry or None), least recently used first
+        self._sessions = OrderedDict()
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+    
+    def _credential_source(self) -> tuple:
+        """Identify the credentials clients should use right now"""
+        # Assumed-role credentials from the web session come first
+        creds = get_session_credentials()
+        if creds is not None:
+            return (creds['AccessKeyId'], creds['SecretAccessKey'], creds.get('SessionToken'))
+        # Then explicit credentials in environment variables
+        if 'AWS_ACCESS_KEY_ID' in os.environ and 'AWS_SECRET_ACCESS_KEY' in os.environ:
+            return (os.environ['AWS_ACCESS_KEY_ID'], os.environ['AWS_SECRET_ACCESS_KEY'],
+                    os.environ.get('AWS_SESSION_TOKEN'))
+        # Profile credentials are read from the files when the session is created, so a
+        # changed file (edited here, by the CLI or by hand) needs a new session
+        return ('profile', os.environ.get('AWS_PROFILE'),
+                stat_key(AWS_CREDENTIALS_PATH), stat_key(AWS_CONFIG_PATH))
+    
+    def _get_client(self, service: str):
+        """Get a cached client for the current credentials, creating it on first use"""
+        source = self._credential_source()
+        key = (service, source)
+        
+        with self._clients_lock:
+            client = self._clients.get(key)
+            if client is None:
+                cached = self._sessions.get(source)
+                if cached is None:
+                    expires = None
+                    if source[0] == 'profile':
+                        self.logger.debug("Creating session with profile-based credentials")
+                        session = boto3.session.Session()
+                    else:
+                        self.logger.debug("Creating session with explicit credentials from environment")
+                        session = boto3.session.Session(aws_access_key_id=source[0],
+                                                        aws_secret_access_key=source[1],
+                                                        aws_session_token=source[2])
+                        creds = get_session_credentials()
+                        if creds is not None:
+                            expires = credentials_expiration_ts(creds)
+                    cached = self._sessions[source] = (session, expires)
+                client = cached[0].client(service, region_name='us-east-1', config=CLIENT_CONFIG)
+                self._clients[key] = client
+            self._sessions.move_to_end(source)
+            self._prune_sessions()
+            return client
+    
+    def _prune_sessions(self) -> None:
+        """Drop sessions whose credentials expired, and the least recently used past MAX_CACHED_SESSIONS"""
+        now = time.time()
+        dropped = [source for source, (_, expires) in self._sessions.items()
+                   if expires is not None and expires <= now]
+        excess = len(self._sessions) - len(dropped) - MAX_CACHED_SESSIONS
+        if excess > 0:
+            dropped += [source for source in self._sessions if source not in dropped][:excess]
+        if dropped:
+            for source in dropped:
+                del self._sessions[source]
+            self._clients = {key: client for key, client in self._clients.items() if key[1] in self._sessions}
+    
+    def clear_client_cache(self):
+        """Drop cached clients so the next call picks up changed profiles or credentials"""
+        with self._clients_lock:
+            self._sessions.clear()
+            self._clients.clear()
     
     def _create_s3_client(self):
         """Create S3 client with proper credential handling"""
-        # Check if we have explicit credentials in environment variables (assumed role)
-        if 'AWS_ACCESS_KEY_ID' in os.environ and 'AWS_SECRET_ACCESS_KEY' in os.environ:
-            self.logger.debug("Creating S3 client with explicit credentials from environment")
-            return boto3.client('s3',
-                              aws_access_key_id=os.environ['AWS_ACCESS_KEY_ID'],
-                              aws_secret_access_key=os.environ['AWS_SECRET_ACCESS_KEY'],
-                              aws_session_token=os.environ.get('AWS_SESSION_TOKEN'),
-                              region_name='us-east-1',
-                              config=boto3.session.Config(signature_version='s3v4'))
-        else:
-            self.logger.debug("Creating S3 client with profile-based credentials")
-            return boto3.client('s3',
-                              region_name='us-east-1',
-                              config=boto3.session.Config(signature_version='s3v4'))
+        return self._get_client('s3')
     
     def _create_sts_client(self):
         """Create STS client with proper credential handling"""
-        # Check if we have explicit credentials in environment variables (assumed role)
-        if 'AWS_ACCESS_KEY_ID' in os.environ and 'AWS_SECRET_ACCESS_KEY' in os.environ:
-            self.logger.debug("Creating STS client with explicit credentials from environment")
-            return boto3.client('sts',
-                              aws_access_key_id=os.environ['AWS_ACCESS_KEY_ID'],
-                              aws_secret_access_key=os.environ['AWS_SECRET_ACCESS_KEY'],
-                              aws_session_token=os.environ.get('AWS_SESSION_TOKEN'),
-                              region_name='us-east-1',
-                              config=boto3.session.Config(signature_version='s3v4'))
-        else:
-            self.logger.debug("Creating STS client with profile-based credentials")
-            return boto3.client('sts',
-                              region_name='us-east-1',
-                              config=boto3.session.Config(signature_version='s3v4'))
+        return self._get_client('sts')
     
     def list_buckets(self) -> Dict[str, Union[bool, str, List[Dict]]]:
         """List all S3 buckets"""
@@ -208,51 +269,49 @@ class S3Manager(LoggerMixin):
             
             objects = []
             folders = []
+            # Folder paths already listed, so folder marker objects aren't added twice
+            folder_paths = set()
             
             # Process folders (CommonPrefixes)
-            if 'CommonPrefixes' in response:
-                for prefix_obj in response['CommonPrefixes']:
-                    folder_name = prefix_obj['Prefix']
+            for prefix_obj in response.get('CommonPrefixes', ()):
+                folder_name = prefix_obj['Prefix']
+                folder_paths.add(folder_name)
+                folders.append({
                     # Remove trailing slash for display
-                    display_name = folder_name.rstrip('/')
-                    folder_path = folder_name
-                    folders.append({
-                        'name': display_name,
-                        'type': 'folder',
-                        'path': folder_path
-                    })
+                    'name': folder_name.rstrip('/'),
+                    'type': 'folder',
+                    'path': folder_name
+                })
 
             # Process objects
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    # Skip the prefix itself if it's an object
-                    if obj['Key'] == prefix:
-                        continue
-
-                    obj_key = obj['Key']
-                    obj_name = obj['Key'].split('/')[-1]
-
-                    # Check if this is a folder-like object (ends with / and size 0)
-                    if obj_name == '' and obj['Size'] == 0 and obj_key.endswith('/'):
-                        # This is a folder marker object
-                        folder_name = obj_key
-                        display_name = obj_key.rstrip('/').split('/')[-1] if '/' in obj_key.rstrip('/') else obj_key.rstrip('/')
-                        if not any(f['path'] == folder_name for f in folders):
-                            folders.append({
-                                'name': display_name,
-                                'type': 'folder',
-                                'path': folder_name
-                            })
-                    else:
-                        # This is a regular file
-                        objects.append({
-                            'name': obj_name,
-                            'key': obj_key,
-                            'type': 'file',
-                            'size': obj['Size'],
-                            'last_modified': obj['LastModified'].isoformat(),
-                            'etag': obj['ETag'].strip('"')
+            for obj in response.get('Contents', ()):
+                obj_key = obj['Key']
+                # Skip the prefix itself if it's an object
+                if obj_key == prefix:
+                    continue
+
+                obj_name = obj_key.rpartition('/')[2]
+
+                # Check if this is a folder-like object (ends with / and size 0)
+                if obj_name == '' and obj['Size'] == 0:
+                    # This is a folder marker object
+                    if obj_key not in folder_paths:
+                        folder_paths.add(obj_key)
+                        folders.append({
+                            'name': obj_key.rstrip('/').rpartition('/')[2],
+                            'type': 'folder',
+                            'path': obj_key
                         })
+                else:
+                    # This is a regular file
+                    objects.append({
+                        'name': obj_name,
+                        'key': obj_key,
+                        'type': 'file',
+                        'size': obj['Size'],
+                        'last_modified': obj['LastModified'].isoformat(),
+                        'etag': obj['ETag'].strip('"')
+                    })
             
             result = {
                 'success': True,
@@ -409,7 +468,8 @@ class S3Manager(LoggerMixin):
 
         try:
             # Check if session token is present (indicates assumed role)
-            has_session_token = bool(os.environ.get('AWS_SESSION_TOKEN'))
+            source = self._credential_source()
+            has_session_token = source[0] != 'profile' and bool(source[2])
 
             # Try to get caller identity, but handle expired tokens gracefully
             try:
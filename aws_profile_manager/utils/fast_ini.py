@@ -0,0 +1,75 @@
+"""
+Lightweight INI parsing for the AWS credentials and config files
+"""
+
+import re
+from pathlib import Path
+from typing import Dict
+
+from aws_profile_manager.utils.files import atomic_write
+
+_SECTION_RE = re.compile(r'\[([^\]]+)\]')
+_KV_RE = re.compile(r'([^=:\s][^=:]*?)\s*[=:]\s*(.*)')
+
+
+def parse(text: str) -> Dict[str, Dict[str, str]]:
+    """Parse INI text into {section: {key: value}}, lower-casing keys like configparser
+
+    Lines indented deeper than the key above them (the nested s3 = blocks of
+    ~/.aws/config) continue its value and are kept verbatim, one per line.
+    """
+    sections = {}
+    current = None
+    key = None
+    key_indent = 0
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line[0] in '#;':
+            continue
+
+        indent = len(raw) - len(raw.lstrip())
+        if key is not None and indent > key_indent:
+            current[key] += '\n' + raw.rstrip()
+            continue
+
+        match = _SECTION_RE.fullmatch(line)
+        if match:
+            current = sections.setdefault(match.group(1), {})
+            key = None
+        elif current is not None:
+            match = _KV_RE.fullmatch(line)
+            if match:
+                key = match.group(1).lower()
+                key_indent = indent
+                current[key] = match.group(2)
+
+    return sections
+
+
+def _line(key: str, value: str) -> str:
+    """One key = value line, with any continuation lines of the value after it"""
+    # A value that starts on the next line gets no trailing space after the '='
+    return f'{key} ={value}\n' if value.startswith('\n') else f'{key} = {value}\n'
+
+
+def dump(sections: Dict[str, Dict[str, str]]) -> str:
+    """Render sections in the same layout configparser writes"""
+    return ''.join(
+        f'[{name}]\n' + ''.join(_line(key, value) for key, value in values.items()) + '\n'
+        for name, values in sections.items()
+    )
+
+
+def read(path: Path) -> Dict[str, Dict[str, str]]:
+    """Parse an INI file, or return no sections if it doesn't exist"""
+    try:
+        with open(path, 'r') as f:
+            return parse(f.read())
+    except FileNotFoundError:
+        return {}
+
+
+def write(path: Path, sections: Dict[str, Dict[str, str]]) -> None:
+    """Atomically write sections to an INI file"""
+    atomic_write(path, dump(sections))
@@ -0,0 +1,41 @@
+"""
+File helpers for AWS Profile Manager
+"""
+
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+
+def stat_key(path: Path):
+    """Cheap change marker for a file: (mtime_ns, size), or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def atomic_write(path: Path, text: str) -> None:
+    """Replace path with text so readers only ever see the old or the new content"""
+    # A fresh name per call, so concurrent writers (threads included) never share one
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # Keep permissions such as a chmod 600 on ~/.aws/credentials
+        try:
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            # A new file keeps mkstemp's owner-only 0600
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
@@ -19,6 +19,7 @@ def main():
     parser.add_argument('--host', default='0.0.0.0', help='Host for web interface (default: 0.0.0.0)')
     parser.add_argument('--port', type=int, default=5000, help='Port for web interface (default: 5000)')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--threads', type=int, default=16, help='Worker threads when served by waitress (default: 16)')
 
     args = parser.parse_args()
 
@@ -27,7 +28,7 @@ def main():
     print(f"🔧 Debug mode: {'ON' if args.debug else 'OFF'}")
     print(f"\n💡 For CLI commands, use: python -m aws_profile_manager.cli <command>")
     
-    run_app(host=args.host, port=args.port, debug=args.debug)
+    run_app(host=args.host, port=args.port, debug=args.debug, threads=args.threads)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,60 @@
+"""
+Tests for switching environments in ~/.aws/config
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from aws_profile_manager.aws.environments import EnvironmentManager
+from aws_profile_manager.core.config import ConfigManager
+
+ROLE_ARN = 'arn:aws:iam::123456789012:role/dev'
+
+AWS_CONFIG = """[profile default]
+region = us-west-2
+s3 =
+    max_concurrent_requests = 20
+    multipart_chunksize = 16MB
+
+[services dev-endpoints]
+s3 =
+  endpoint_url = http://localhost:4566
+
+"""
+
+
+class SwitchEnvironmentTest(unittest.TestCase):
+
+    def test_switch_keeps_nested_blocks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = Path(tmp) / 'config.json'
+            config_file.write_text(json.dumps({
+                'environments': {'dev': {'region': 'us-east-1', 'role_arn': ROLE_ARN}}
+            }))
+            manager = EnvironmentManager(ConfigManager(str(config_file)))
+            manager.config_path = Path(tmp) / 'config'
+            manager.config_path.write_text(AWS_CONFIG)
+
+            self.assertTrue(manager.switch_environment('dev'))
+
+            self.assertEqual(manager.config_path.read_text(), """[profile default]
+region = us-east-1
+s3 =
+    max_concurrent_requests = 20
+    multipart_chunksize = 16MB
+role_arn = arn:aws:iam::123456789012:role/dev
+source_profile = infrrd-master
+duration_seconds = 3600
+
+[services dev-endpoints]
+s3 =
+  endpoint_url = http://localhost:4566
+
+""")
+            self.assertEqual(manager.get_current_environment(), 'dev')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Round-trip tests for the lightweight INI parser
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from aws_profile_manager.aws.credentials import AWSCredentialsManager
+from aws_profile_manager.utils import fast_ini
+
+NESTED = """[default]
+aws_access_key_id = AKIADEFAULT
+aws_secret_access_key = secret
+s3 =
+    max_concurrent_requests = 20
+    multipart_chunksize = 16MB
+
+[other]
+aws_access_key_id = AKIAOTHER
+aws_secret_access_key = other-secret
+
+"""
+
+
+class FastIniTest(unittest.TestCase):
+
+    def test_nested_block_round_trips(self):
+        sections = fast_ini.parse(NESTED)
+        self.assertEqual(sections['default']['s3'],
+                         '\n    max_concurrent_requests = 20\n    multipart_chunksize = 16MB')
+        self.assertNotIn('max_concurrent_requests', sections['default'])
+        self.assertEqual(fast_ini.dump(sections), NESTED)
+
+    def test_credentials_edits_keep_nested_block(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = AWSCredentialsManager()
+            manager.credentials_path = Path(tmp) / 'credentials'
+            manager.config_path = Path(tmp) / 'config'
+            manager.credentials_path.write_text(NESTED)
+
+            self.assertTrue(manager.save_credentials('added', 'AKIAADDED', 'added-secret'))
+            self.assertTrue(manager.remove_profile('added'))
+
+            self.assertEqual(manager.credentials_path.read_text(), NESTED)
+
+
+if __name__ == '__main__':
+    unittest.main()